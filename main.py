@@ -10,14 +10,15 @@ import argparse
 import asyncio
 import logging
 from typing import List
-import multiprocessing
 import signal
-import time
+import traceback
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+from src.core.agent import BaseAgent
+from src.core.storage import get_mongo_client, close_mongo_clients
 from src.agents.content_scheduler.agent import ContentSchedulerAgent
 from src.agents.platform_posting.facebook.agent import FacebookPostingAgent
 
@@ -33,54 +34,122 @@ logging.basicConfig(
 
 logger = logging.getLogger("socialspark.main")
 
+# Seconds to wait for all agents to stop after a shutdown signal
+SHUTDOWN_TIMEOUT = 5
 
-def run_content_scheduler_agent(mongodb_url, db_name="socialspark_content_scheduler"):
+
+def create_content_scheduler_agent(mongodb_url, db_name="socialspark_content_scheduler"):
     """
-    Run the Content & Scheduling Agent.
+    Create the Content & Scheduling Agent.
     
     Args:
         mongodb_url: MongoDB connection URL
         db_name: Database name for this agent
+        
+    Returns:
+        The agent, or None if it could not be created
     """
     try:
-        # Create and setup the agent
-        agent = ContentSchedulerAgent(
+        return ContentSchedulerAgent(
             port=8001,
             connection_string=mongodb_url,
             db_name=db_name,
-            media_storage_path="./data/media"
+            media_storage_path="./data/media",
+            client=get_mongo_client(mongodb_url)
         )
-        
-        # Run the agent - this will start the scheduler and FastAPI
-        agent.run()
-        
-    except KeyboardInterrupt:
-        logger.info("Content & Scheduling Agent stopped")
     except Exception as e:
-        logger.error(f"Error running Content & Scheduling Agent: {e}")
-        import traceback
+        logger.error(f"Error creating Content & Scheduling Agent: {e}")
         logger.error(traceback.format_exc())
+        return None
 
 
-def run_facebook_agent(mongodb_url, db_name="socialspark_facebook_agent"):
+def create_facebook_agent(mongodb_url, db_name="socialspark_facebook_agent"):
     """
-    Run the Facebook Platform Posting Agent.
+    Create the Facebook Platform Posting Agent.
     
     Args:
         mongodb_url: MongoDB connection URL
         db_name: Database name for this agent
+        
+    Returns:
+        The agent, or None if it could not be created
     """
     try:
-        agent = FacebookPostingAgent(
+        return FacebookPostingAgent(
             port=8002,
             connection_string=mongodb_url,
-            db_name=db_name
+            db_name=db_name,
+            client=get_mongo_client(mongodb_url)
         )
-        agent.run()
-    except KeyboardInterrupt:
-        logger.info("Facebook Platform Posting Agent stopped")
     except Exception as e:
-        logger.error(f"Error running Facebook Platform Posting Agent: {e}")
+        logger.error(f"Error creating Facebook Platform Posting Agent: {e}")
+        return None
+
+
+async def run_agents(agents: List[BaseAgent], shutdown_timeout: float = SHUTDOWN_TIMEOUT) -> None:
+    """
+    Serve all agents on the current event loop until they are shut down.
+    
+    SIGINT/SIGTERM ask every agent's server to exit cooperatively. Agents
+    that are still running after shutdown_timeout seconds (a single
+    deadline shared by all agents) are forced to exit. A second signal
+    forces the exit immediately.
+    
+    Args:
+        agents: Agents to run
+        shutdown_timeout: Seconds to wait for a graceful shutdown
+    """
+    loop = asyncio.get_running_loop()
+    stop_requested = asyncio.Event()
+    
+    def handle_signal():
+        if stop_requested.is_set():
+            for agent in agents:
+                agent.request_shutdown(force=True)
+        stop_requested.set()
+    
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, handle_signal)
+        except NotImplementedError:
+            # Not supported on Windows; Ctrl+C raises KeyboardInterrupt instead
+            pass
+    
+    tasks = {asyncio.create_task(agent.run_async()): agent for agent in agents}
+    serving = asyncio.gather(*tasks, return_exceptions=True)
+    stop_waiter = asyncio.create_task(stop_requested.wait())
+    
+    await asyncio.wait({serving, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+    
+    if stop_requested.is_set():
+        logger.info("Shutting down SocialSpark Orchestrator...")
+        for agent in agents:
+            agent.request_shutdown()
+        
+        _, pending = await asyncio.wait(tasks, timeout=shutdown_timeout)
+        for task in pending:
+            logger.warning(f"{tasks[task].name} did not stop within {shutdown_timeout}s, forcing exit")
+            tasks[task].request_shutdown(force=True)
+            task.cancel()
+    
+    stop_waiter.cancel()
+    results = await serving
+    
+    for agent, result in zip(tasks.values(), results):
+        if isinstance(result, Exception):
+            logger.error(f"Error running {agent.name}: {result}")
+
+
+def install_event_loop_policy() -> None:
+    """Use uvloop for the shared event loop where it is available."""
+    if sys.platform == "win32":
+        return
+    try:
+        import uvloop
+    except ImportError:
+        logger.info("uvloop not installed, using the default asyncio event loop")
+        return
+    uvloop.install()
 
 
 def parse_args():
@@ -127,54 +196,41 @@ def main():
     cs_db_name = f"{args.mongodb_db_prefix}_content_scheduler"
     fb_db_name = f"{args.mongodb_db_prefix}_facebook_agent"
     
-    processes = []
+    agents = []
+    
+    # Create Content & Scheduler Agent if requested
+    if "content-scheduler" in args.agents:
+        logger.info(f"Starting Content & Scheduling Agent (DB: {cs_db_name})...")
+        cs_agent = create_content_scheduler_agent(args.mongodb_url, cs_db_name)
+        if cs_agent:
+            agents.append(cs_agent)
+        
+    # Create Facebook Platform Posting Agent if requested
+    if "facebook" in args.agents:
+        logger.info(f"Starting Facebook Platform Posting Agent (DB: {fb_db_name})...")
+        fb_agent = create_facebook_agent(args.mongodb_url, fb_db_name)
+        if fb_agent:
+            agents.append(fb_agent)
+    
+    if not agents:
+        logger.error("No agents to run")
+        return
+    
+    install_event_loop_policy()
     
     try:
-        # Start Content & Scheduler Agent if requested
-        if "content-scheduler" in args.agents:
-            logger.info(f"Starting Content & Scheduling Agent (DB: {cs_db_name})...")
-            cs_process = multiprocessing.Process(
-                target=run_content_scheduler_agent,
-                args=(args.mongodb_url, cs_db_name)
-            )
-            cs_process.start()
-            processes.append(cs_process)
-            
-        # Start Facebook Platform Posting Agent if requested
-        if "facebook" in args.agents:
-            logger.info(f"Starting Facebook Platform Posting Agent (DB: {fb_db_name})...")
-            fb_process = multiprocessing.Process(
-                target=run_facebook_agent,
-                args=(args.mongodb_url, fb_db_name)
-            )
-            fb_process.start()
-            processes.append(fb_process)
-            
-        # Wait for all processes to complete
-        for process in processes:
-            process.join()
-            
+        # Run all agents in a single event loop
+        asyncio.run(run_agents(agents))
     except KeyboardInterrupt:
         logger.info("Shutting down SocialSpark Orchestrator...")
-        
-        # Terminate all processes
-        for process in processes:
-            if process.is_alive():
-                process.terminate()
-                
-        # Wait for processes to terminate
-        for process in processes:
-            process.join(timeout=5)
-            
-        logger.info("All agents stopped")
-    
     except Exception as e:
         logger.error(f"Error running SocialSpark Orchestrator: {e}")
-        
-        # Terminate all processes on error
-        for process in processes:
-            if process.is_alive():
-                process.terminate()
+    finally:
+        for agent in agents:
+            agent.shutdown()
+        close_mongo_clients()
+    
+    logger.info("All agents stopped")
 
 
 if __name__ == "__main__":
@@ -8,12 +8,21 @@ for optimal performance. It supports both local MongoDB and MongoDB Atlas.
 """
 
 import argparse
+import asyncio
 import logging
 import sys
 import os
 from dotenv import load_dotenv
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, UpdateOne, ASCENDING, DESCENDING
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo.server_api import ServerApi
+
+from src.core.storage import TASK_INDEXES
+from src.core.utils import parse_iso_datetime
+from src.agents.content_scheduler.storage import (
+    POST_INDEXES, POST_BULK_WRITE_BATCH_SIZE, _DATETIME_POST_FIELDS, _to_stored_datetime
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -26,117 +35,221 @@ logging.basicConfig(
 
 logger = logging.getLogger("socialspark.setup")
 
-def setup_task_storage(client, db_prefix="socialspark"):
+async def _ensure_indexes(collection, models, superseded=()):
+    """
+    Create missing indexes on a collection and drop superseded ones.
+    
+    Existing indexes are read with a single index_information() call and
+    compared by name, so re-running setup issues no index commands once
+    everything is in place. Creating an index also creates the collection.
+    
+    Args:
+        collection: MongoDB collection
+        models: IndexModels the collection should have
+        superseded: Names of indexes to drop if present
+        
+    Returns:
+        Names of the indexes that were created
+    """
+    existing = await collection.index_information()
+    
+    missing = [model for model in models if model.document["name"] not in existing]
+    created = await collection.create_indexes(missing) if missing else []
+    if created:
+        logger.info(f"Created indexes {', '.join(created)} on {collection.full_name}")
+    else:
+        logger.info(f"Indexes already up to date on {collection.full_name}")
+    
+    for index_name in superseded:
+        if index_name in existing:
+            await collection.drop_index(index_name)
+            logger.info(f"Dropped superseded {index_name} index on {collection.full_name}")
+    
+    return created
+
+
+async def _migrate_post_dates(posts):
+    """
+    Convert post dates stored as ISO 8601 strings to native BSON dates.
+    
+    The strings are parsed here with the same rule PostStorage reads them
+    with, so naive ones are taken as local time rather than as UTC. Strings
+    that can't be parsed are left unchanged and counted afterwards.
+    
+    Args:
+        posts: Async posts collection
+    """
+    query = {"$or": [{field: {"$type": "string"}} for field in _DATETIME_POST_FIELDS]}
+    
+    converted = 0
+    updates = []
+    async for doc in posts.find(query, {field: 1 for field in _DATETIME_POST_FIELDS}):
+        fields = {}
+        for field in _DATETIME_POST_FIELDS:
+            value = doc.get(field)
+            if not isinstance(value, str):
+                continue
+            try:
+                fields[field] = _to_stored_datetime(parse_iso_datetime(value))
+            except ValueError:
+                pass
+        if fields:
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+        if len(updates) >= POST_BULK_WRITE_BATCH_SIZE:
+            converted += (await posts.bulk_write(updates, ordered=False)).modified_count
+            updates = []
+    if updates:
+        converted += (await posts.bulk_write(updates, ordered=False)).modified_count
+    
+    if converted:
+        logger.info(f"Converted string dates to dates on {converted} posts in {posts.full_name}")
+    
+    # Range queries on schedule_time skip posts whose dates are still strings
+    remaining = await posts.count_documents(query)
+    if remaining:
+        logger.warning(f"{remaining} posts in {posts.full_name} still hold dates that could not be parsed")
+
+
+async def setup_task_storage(client, db_prefix="socialspark"):
     """
     Set up the task storage collections and indexes.
     
     Args:
-        client: MongoDB client
+        client: Async MongoDB client
         db_prefix: Database name prefix
     """
     db_name = f"{db_prefix}"
     db = client[db_name]
     
-    # Create tasks collection if it doesn't exist
-    if "tasks" not in db.list_collection_names():
-        db.create_collection("tasks")
-        logger.info(f"Created tasks collection in {db_name} database")
-    
-    # Create indexes for tasks collection
-    tasks = db.tasks
-    tasks.create_index([("status", ASCENDING)])
-    tasks.create_index([("source_agent_id", ASCENDING)])
-    tasks.create_index([("target_agent_id", ASCENDING)])
-    tasks.create_index([("updated_at", DESCENDING)])
-    logger.info(f"Created indexes for tasks collection in {db_name} database")
+    # status_recent and target_status start with status and target_agent_id,
+    # so they supersede the single-field indexes on those
+    await _ensure_indexes(
+        db.tasks,
+        TASK_INDEXES + [
+            IndexModel([("source_agent_id", ASCENDING)]),
+            IndexModel([("updated_at", DESCENDING)])
+        ],
+        superseded=("status_1", "target_agent_id_1")
+    )
 
-def setup_content_scheduler_storage(client, db_prefix="socialspark"):
+async def setup_content_scheduler_storage(client, db_prefix="socialspark"):
     """
     Set up the content scheduler storage collections and indexes.
     
     Args:
-        client: MongoDB client
+        client: Async MongoDB client
         db_prefix: Database name prefix
     """
     db_name = f"{db_prefix}_content_scheduler"
     db = client[db_name]
     
-    # Create posts collection if it doesn't exist
-    if "posts" not in db.list_collection_names():
-        db.create_collection("posts")
-        logger.info(f"Created posts collection in {db_name} database")
-    
-    # Create scheduler_jobs collection if it doesn't exist
-    if "scheduler_jobs" not in db.list_collection_names():
-        db.create_collection("scheduler_jobs")
-        logger.info(f"Created scheduler_jobs collection in {db_name} database")
-    
-    # Create indexes for posts collection
-    posts = db.posts
-    posts.create_index([("status", ASCENDING)])
-    posts.create_index([("user_id", ASCENDING)])
-    posts.create_index([("schedule_time", ASCENDING)])
-    posts.create_index([("created_at", DESCENDING)])
-    logger.info(f"Created indexes for posts collection in {db_name} database")
-    
-    # Handle scheduler_jobs index carefully - it might already exist
+    # The compound indexes PostStorage queries by supersede the old single-field ones
+    await _ensure_indexes(
+        db.posts, POST_INDEXES,
+        superseded=("status_1", "schedule_time_1", "user_id_1", "created_at_-1", "status_schedule")
+    )
+    
+    # Posts used to store their dates as strings, which range queries can't compare with dates
+    await _migrate_post_dates(db.posts)
+    
+    # Handle scheduler_jobs index carefully - it might already exist.
+    # APScheduler's MongoDBJobStore only filters and sorts on next_run_time,
+    # so a sparse index on that field covers its due-jobs query.
     scheduler_jobs = db.scheduler_jobs
     try:
-        # First check if we need to drop an existing incompatible index
-        existing_indexes = list(scheduler_jobs.list_indexes())
-        next_run_time_index_exists = False
+        # If a next_run_time index exists but isn't sparse, drop it so it is recreated
+        for index_name, index_info in (await scheduler_jobs.index_information()).items():
+            index_fields = [field for field, _ in index_info["key"]]
+            if "next_run_time" in index_fields and not index_info.get("sparse", False):
+                logger.info(f"Dropping incompatible next_run_time index in {db_name} database")
+                await scheduler_jobs.drop_index(index_name)
         
-        for index in existing_indexes:
-            if 'next_run_time' in index['key']:
-                # If the index exists but doesn't have sparse=True, drop it
-                if index.get('sparse', False) != True:
-                    logger.info(f"Dropping incompatible next_run_time index in {db_name} database")
-                    scheduler_jobs.drop_index(index['name'])
-                else:
-                    next_run_time_index_exists = True
-        
-        # Only create the index if it doesn't exist or we dropped the incompatible one
-        if not next_run_time_index_exists:
-            scheduler_jobs.create_index([("next_run_time", ASCENDING)], sparse=True)
-            logger.info(f"Created next_run_time index for scheduler_jobs in {db_name} database")
-        else:
-            logger.info(f"Reusing existing next_run_time index in {db_name} database")
+        await _ensure_indexes(scheduler_jobs, [
+            IndexModel([("next_run_time", ASCENDING)], sparse=True)
+        ])
             
     except Exception as e:
         logger.warning(f"Warning handling scheduler_jobs index: {e}")
         logger.info("Continuing setup process...")
 
-def setup_facebook_agent_storage(client, db_prefix="socialspark"):
+async def setup_facebook_agent_storage(client, db_prefix="socialspark"):
     """
     Set up the Facebook agent storage collections and indexes.
     
     Args:
-        client: MongoDB client
+        client: Async MongoDB client
         db_prefix: Database name prefix
     """
     db_name = f"{db_prefix}_facebook_agent"
     db = client[db_name]
     
-    # Create facebook_credentials collection if it doesn't exist
-    if "facebook_credentials" not in db.list_collection_names():
-        db.create_collection("facebook_credentials")
-        logger.info(f"Created facebook_credentials collection in {db_name} database")
+    await _ensure_indexes(db.facebook_credentials, [
+        IndexModel([("user_id", ASCENDING)], unique=True)
+    ])
     
-    # Create facebook_posts collection if it doesn't exist
-    if "facebook_posts" not in db.list_collection_names():
-        db.create_collection("facebook_posts")
-        logger.info(f"Created facebook_posts collection in {db_name} database")
+    # The compound index also serves queries on socialspark_post_id alone
+    # (index prefix), so no separate single-field index is needed for it.
+    await _ensure_indexes(db.facebook_posts, [
+        IndexModel([("socialspark_post_id", ASCENDING), ("publish_time", DESCENDING)]),
+        IndexModel([("platform_post_id", ASCENDING)])
+    ], superseded=("socialspark_post_id_1", "publish_time_-1"))
+
+async def run_setup(args):
+    """
+    Connect to MongoDB and set up all agent storages concurrently.
     
-    # Create indexes
-    facebook_credentials = db.facebook_credentials
-    facebook_credentials.create_index([("user_id", ASCENDING)], unique=True)
+    The storages live in separate databases, so their setup round trips
+    are independent and run in parallel.
     
-    facebook_posts = db.facebook_posts
-    facebook_posts.create_index([("socialspark_post_id", ASCENDING)])
-    facebook_posts.create_index([("platform_post_id", ASCENDING)])
-    facebook_posts.create_index([("publish_time", DESCENDING)])
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Process exit code
+    """
+    # Configure client with timeouts
+    client = AsyncIOMotorClient(
+        args.mongodb_url,
+        serverSelectionTimeoutMS=args.timeout,
+        connectTimeoutMS=args.timeout,
+        socketTimeoutMS=args.timeout,
+        # Same Stable API version the agents pin
+        server_api=ServerApi("1")
+    )
     
-    logger.info(f"Created indexes for Facebook agent collections in {db_name} database")
+    try:
+        # Test connection
+        await client.admin.command('ping')
+        logger.info("Successfully connected to MongoDB")
+        
+        # Set up collections and indexes
+        steps = [
+            ("task storage", setup_task_storage),
+            ("content scheduler storage", setup_content_scheduler_storage),
+            ("Facebook agent storage", setup_facebook_agent_storage)
+        ]
+        results = await asyncio.gather(
+            *(setup(client, args.mongodb_db_prefix) for _, setup in steps),
+            return_exceptions=True
+        )
+        
+        success = True
+        for (label, _), result in zip(steps, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error setting up {label}: {result}")
+                success = False
+                
+        if not success and not args.force:
+            return 1
+        
+        if success:
+            logger.info("MongoDB setup completed successfully")
+        else:
+            logger.info("MongoDB setup completed with some errors")
+        
+        return 0
+    finally:
+        client.close()
 
 def main():
     """Main entry point."""
@@ -168,50 +281,8 @@ def main():
     
     logger.info(f"Connecting to MongoDB at {args.mongodb_url}")
     
-    # Configure client with timeouts
     try:
-        client = MongoClient(
-            args.mongodb_url,
-            serverSelectionTimeoutMS=args.timeout,
-            connectTimeoutMS=args.timeout,
-            socketTimeoutMS=args.timeout
-        )
-        
-        # Test connection
-        client.admin.command('ping')
-        logger.info("Successfully connected to MongoDB")
-        
-        # Set up collections and indexes
-        success = True
-        
-        try:
-            setup_task_storage(client, args.mongodb_db_prefix)
-        except Exception as e:
-            logger.error(f"Error setting up task storage: {e}")
-            if not args.force:
-                return 1
-            success = False
-            
-        try:
-            setup_content_scheduler_storage(client, args.mongodb_db_prefix)
-        except Exception as e:
-            logger.error(f"Error setting up content scheduler storage: {e}")
-            if not args.force:
-                return 1
-            success = False
-            
-        try:
-            setup_facebook_agent_storage(client, args.mongodb_db_prefix)
-        except Exception as e:
-            logger.error(f"Error setting up Facebook agent storage: {e}")
-            if not args.force:
-                return 1
-            success = False
-        
-        if success:
-            logger.info("MongoDB setup completed successfully")
-        else:
-            logger.info("MongoDB setup completed with some errors")
+        return asyncio.run(run_setup(args))
         
     except ConnectionFailure as e:
         logger.error(f"Could not connect to MongoDB: {e}")
@@ -231,8 +302,6 @@ def main():
     except Exception as e:
         logger.error(f"Error setting up MongoDB: {e}")
         return 1
-        
-    return 0
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
@@ -4,15 +4,99 @@ Content Adaptation for Content & Scheduling Agent.
 This module provides functionality to adapt content for different social platforms.
 """
 
-import re
 import logging
-from typing import List, Set, Dict, Any, Optional
+from typing import List, Dict, NamedTuple, Optional, Tuple
 
 from src.agents.content_scheduler.models import (
     SocialPlatform, PlatformSpecificContent, ContentAdaptationRules
 )
 
 
+try:
+    # Linear-time matching, no backtracking on captions full of '#'
+    import re2 as re
+    # RE2's \w is ASCII-only; spell out the Unicode classes Python's \w matches
+    _WORD_CHARS = r'[\p{L}\p{N}_]'
+except ImportError:
+    import re
+    _WORD_CHARS = r'\w'
+
+
+# Hashtag pattern, compiled once at import (word starting with # and containing only word chars)
+_HASHTAG_RE = re.compile(r'#(' + _WORD_CHARS + r'+)')
+
+
+class _CompiledRules(NamedTuple):
+    """Adaptation rules pre-digested into the values adaptation actually reads."""
+    max_text_length: int
+    hashtag_prefix: Optional[str]  # None when the format needs str.format
+    hashtag_suffix: str
+    image_required: bool
+    max_images: int
+
+
+# Compiled rules per platform, with the rules object they were compiled from
+_COMPILED_RULES: Dict[SocialPlatform, Tuple[ContentAdaptationRules, _CompiledRules]] = {}
+
+
+def _split_hashtag_format(hashtag_format: str) -> Tuple[Optional[str], str]:
+    """
+    Split a hashtag format into the text around its placeholder.
+    
+    Args:
+        hashtag_format: Format string for hashtags
+        
+    Returns:
+        Tuple of (prefix, suffix), or (None, "") if the format is not a single plain {} placeholder
+    """
+    prefix, placeholder, suffix = hashtag_format.partition("{}")
+    if placeholder and not any(c in prefix or c in suffix for c in "{}"):
+        return prefix, suffix
+    return None, ""
+
+
+def _compile_rules(platform: SocialPlatform, rules: ContentAdaptationRules) -> _CompiledRules:
+    """
+    Get the compiled form of a platform's rules, compiling them on first use.
+    
+    The cache holds the rules object itself, so passing a different rules
+    object for the same platform recompiles instead of reusing stale values.
+    
+    Args:
+        platform: Target social platform
+        rules: Content adaptation rules for the platform
+        
+    Returns:
+        Compiled rules
+    """
+    cached = _COMPILED_RULES.get(platform)
+    if cached is not None and cached[0] is rules:
+        return cached[1]
+    
+    image_requirements = rules.image_requirements or {}
+    prefix, suffix = _split_hashtag_format(rules.hashtag_format)
+    compiled = _CompiledRules(
+        max_text_length=rules.max_text_length,
+        hashtag_prefix=prefix,
+        hashtag_suffix=suffix,
+        image_required=bool(image_requirements.get("required", False)),
+        max_images=image_requirements.get("max_images", 0)
+    )
+    _COMPILED_RULES[platform] = (rules, compiled)
+    return compiled
+
+
+def precompile_rules(adaptation_rules: Dict[SocialPlatform, ContentAdaptationRules]) -> None:
+    """
+    Compile a set of platform rules ahead of the first adaptation.
+    
+    Args:
+        adaptation_rules: Adaptation rules keyed by platform
+    """
+    for platform, rules in adaptation_rules.items():
+        _compile_rules(platform, rules)
+
+
 def extract_hashtags(text: str) -> List[str]:
     """
     Extract hashtags from text.
@@ -23,9 +107,28 @@ def extract_hashtags(text: str) -> List[str]:
     Returns:
         List of hashtags (without the # symbol)
     """
-    # Find all hashtags in the text (word starting with # and containing only word chars)
-    matches = re.findall(r'#(\w+)', text)
-    return matches
+    return _HASHTAG_RE.findall(text)
+
+
+def _split_hashtags(text: str) -> Tuple[List[str], str]:
+    """
+    Separate hashtags from text in a single pass.
+    
+    Args:
+        text: Text to split
+        
+    Returns:
+        Tuple of (hashtags without the # symbol, text with hashtags removed and stripped)
+    """
+    hashtags = []
+    parts = []
+    prev_end = 0
+    for match in _HASHTAG_RE.finditer(text):
+        parts.append(text[prev_end:match.start()])
+        hashtags.append(match.group(1))
+        prev_end = match.end()
+    parts.append(text[prev_end:])
+    return hashtags, "".join(parts).strip()
 
 
 def format_hashtags(hashtags: List[str], hashtag_format: str) -> List[str]:
@@ -39,6 +142,14 @@ def format_hashtags(hashtags: List[str], hashtag_format: str) -> List[str]:
     Returns:
         List of formatted hashtags
     """
+    if hashtag_format == "#{}":
+        return ["#" + tag for tag in hashtags]
+    
+    # A single plain {} placeholder is just concatenation; anything else goes through str.format
+    prefix, suffix = _split_hashtag_format(hashtag_format)
+    if prefix is not None:
+        return [prefix + tag + suffix for tag in hashtags]
+    
     return [hashtag_format.format(tag) for tag in hashtags]
 
 
@@ -55,20 +166,14 @@ def truncate_text(text: str, max_length: int) -> str:
     """
     if len(text) <= max_length:
         return text
-        
-    # Truncate to max_length
-    truncated = text[:max_length]
     
-    # Find the last space to avoid cutting words
-    last_space = truncated.rfind(' ')
-    if last_space > 0:
-        truncated = truncated[:last_space]
+    # Cut at the last space within the limit to avoid cutting words
+    cut = text.rfind(' ', 0, max_length)
+    if cut <= 0:
+        cut = max_length
     
-    # Add ellipsis if truncated
-    if len(truncated) < len(text):
-        truncated += "..."
-        
-    return truncated
+    # Text was truncated, so add an ellipsis
+    return text[:cut] + "..."
 
 
 def adapt_content_for_platform(
@@ -89,25 +194,80 @@ def adapt_content_for_platform(
     Returns:
         Platform-specific content
     """
-    # Extract hashtags from the raw text
-    hashtags = extract_hashtags(raw_text)
+    # Extract hashtags and remove them from the text (we'll add them back formatted)
+    hashtags, clean_text = _split_hashtags(raw_text)
+    return _adapt_with_extracted(hashtags, clean_text, image_reference, platform, rules)
+
+
+def adapt_content_for_platforms(
+    raw_text: str,
+    image_reference: Optional[str],
+    platforms_rules: List[Tuple[SocialPlatform, ContentAdaptationRules]]
+) -> List[PlatformSpecificContent]:
+    """
+    Adapt content for several platforms, extracting hashtags only once.
     
-    # Format hashtags according to platform rules
-    formatted_hashtags = format_hashtags(hashtags, rules.hashtag_format)
+    Args:
+        raw_text: Original text content
+        image_reference: Reference to image file, if any
+        platforms_rules: Target platforms paired with their adaptation rules
+        
+    Returns:
+        Platform-specific content, in the same order as platforms_rules
+    """
+    hashtags, clean_text = _split_hashtags(raw_text)
+    return [
+        _adapt_with_extracted(hashtags, clean_text, image_reference, platform, rules)
+        for platform, rules in platforms_rules
+    ]
+
+
+def _adapt_with_extracted(
+    hashtags: List[str],
+    clean_text: str,
+    image_reference: Optional[str],
+    platform: SocialPlatform,
+    rules: ContentAdaptationRules
+) -> PlatformSpecificContent:
+    """
+    Adapt already split content for a specific platform.
+    
+    Args:
+        hashtags: Hashtags extracted from the original text (without the # symbol)
+        clean_text: Original text with hashtags removed
+        image_reference: Reference to image file, if any
+        platform: Target social platform
+        rules: Content adaptation rules for the platform
+        
+    Returns:
+        Platform-specific content
+    """
+    compiled = _compile_rules(platform, rules)
     
-    # Remove hashtags from text (we'll add them back formatted)
-    clean_text = re.sub(r'#\w+', '', raw_text).strip()
+    # Format hashtags according to platform rules
+    if compiled.hashtag_prefix is not None:
+        prefix, suffix = compiled.hashtag_prefix, compiled.hashtag_suffix
+        formatted_hashtags = [prefix + tag + suffix for tag in hashtags]
+    else:
+        formatted_hashtags = [rules.hashtag_format.format(tag) for tag in hashtags]
     
     # Truncate text if necessary
-    max_text_length = rules.max_text_length
+    max_text_length = compiled.max_text_length
     if hashtags:
-        # Reserve some characters for hashtags if present
+        # Length of the space-joined hashtags, measured without building the string
+        hashtag_length = sum(map(len, formatted_hashtags)) + len(formatted_hashtags) - 1
+        if len(clean_text) + hashtag_length + 1 <= max_text_length:
+            # Everything fits, so there is nothing to truncate
+            truncated_text = clean_text
+        else:
+            # Reserve some characters for hashtags
+            max_content_length = max_text_length - hashtag_length - 1  # -1 for space
+            if max_content_length < 0:
+                max_content_length = int(max_text_length / 2)  # Fallback if there are too many hashtags
+                
+            truncated_text = truncate_text(clean_text, max_content_length)
+        
         hashtag_text = " ".join(formatted_hashtags)
-        max_content_length = max_text_length - len(hashtag_text) - 1  # -1 for space
-        if max_content_length < 0:
-            max_content_length = int(max_text_length / 2)  # Fallback if there are too many hashtags
-            
-        truncated_text = truncate_text(clean_text, max_content_length)
         
         # Add hashtags back at the end
         if truncated_text and hashtag_text:
@@ -122,14 +282,12 @@ def adapt_content_for_platform(
     adapted_image_reference = image_reference
     platform_metadata = {}
     
-    image_requirements = rules.image_requirements or {}
-    
     # Handle platform-specific image requirements
-    if platform == SocialPlatform.INSTAGRAM and image_requirements.get("required", False) and not image_reference:
+    if platform == SocialPlatform.INSTAGRAM and compiled.image_required and not image_reference:
         # Instagram requires an image
         platform_metadata["warning"] = "Instagram requires an image for posts"
     
-    if platform == SocialPlatform.TWITTER and image_reference and image_requirements.get("max_images", 0) > 0:
+    if platform == SocialPlatform.TWITTER and image_reference and compiled.max_images > 0:
         # Twitter supports multiple images, but we're just using one here
         platform_metadata["images_count"] = 1
     
@@ -7,28 +7,169 @@ platforms, and scheduling it for publication.
 
 import os
 import json
+import hashlib
 import uuid
 import logging
-from typing import Dict, List, Optional, Any, Union
-from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Any, Union
+from datetime import datetime, timedelta, timezone
 import asyncio
 from functools import partial
 
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.jobstores.mongodb import MongoDBJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from pymongo import MongoClient
 
 from src.core.agent import BaseAgent
 from src.core.models import Task, DataPart, Capability, TaskStatus
-from src.core.utils import create_data_part, generate_id, extract_data_part_by_content_type
-from src.core.storage import TaskStorage
+from src.core.utils import (
+    create_data_part, generate_id, extract_data_part_by_content_type, decode_image
+)
+from src.core.storage import TaskStorage, get_mongo_client
 
 from src.agents.content_scheduler.models import (
     ContentType, PostStatus, SocialPlatform, 
-    PlatformSpecificContent, ScheduledPost, ContentAdaptationRules
+    PlatformSpecificContent, ScheduledPost, ContentAdaptationRules, ProcessScheduleRequest
 )
 from src.agents.content_scheduler.storage import PostStorage
-from src.agents.content_scheduler.adapters import adapt_content_for_platform
+from src.agents.content_scheduler.adapters import adapt_content_for_platforms, precompile_rules
+from src.agents.content_scheduler.jobstore import BatchedMongoDBJobStore
+
+
+# Seconds a publication may run late (e.g. after downtime) and still fire
+PUBLISH_MISFIRE_GRACE_TIME = 3600
+
+# Options for every publication job
+PUBLISH_JOB_DEFAULTS = {
+    "misfire_grace_time": PUBLISH_MISFIRE_GRACE_TIME,
+    "coalesce": True,
+    "max_instances": 1
+}
+
+# Posting agent ID and token field for each platform, built once instead of per publish
+_POSTING_AGENT_IDS = {platform: f"{platform.value}-posting-agent" for platform in SocialPlatform}
+_TOKEN_FIELDS = {platform: f"{platform.value}_token" for platform in SocialPlatform}
+
+
+def _store_image(image_data: str, image_path: str) -> bool:
+    """
+    Save a base64 image to its content-addressed path, skipping the write if it is already stored.
+    
+    Args:
+        image_data: Base64 encoded image data
+        image_path: Path named after the image payload
+        
+    Returns:
+        True if the image is stored at the path, False otherwise
+    """
+    if os.path.exists(image_path):
+        return True
+    return decode_image(image_data, image_path)
+
+
+def _facebook_publish_fields(credentials: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the publish task fields from a post's Facebook credentials."""
+    page_id = credentials.get("page_id")
+    return {"facebook_page_id": page_id} if page_id else {}
+
+
+# Builds the extra publish task fields for a platform from that platform's credentials
+_CREDENTIAL_EXTRACTORS: Dict[SocialPlatform, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    SocialPlatform.FACEBOOK: _facebook_publish_fields,
+}
+
+# Platform-specific content adaptation rules
+_ADAPTATION_RULES: Dict[SocialPlatform, ContentAdaptationRules] = {
+    SocialPlatform.TWITTER: ContentAdaptationRules(
+        platform=SocialPlatform.TWITTER,
+        max_text_length=280,
+        hashtag_format="#{}",
+        image_requirements={"max_images": 4}
+    ),
+    SocialPlatform.FACEBOOK: ContentAdaptationRules(
+        platform=SocialPlatform.FACEBOOK,
+        max_text_length=5000,
+        hashtag_format="#{}",
+        image_requirements={}
+    ),
+    SocialPlatform.INSTAGRAM: ContentAdaptationRules(
+        platform=SocialPlatform.INSTAGRAM,
+        max_text_length=2200,
+        hashtag_format="#{}",
+        image_requirements={"required": True}
+    ),
+    SocialPlatform.LINKEDIN: ContentAdaptationRules(
+        platform=SocialPlatform.LINKEDIN,
+        max_text_length=3000,
+        hashtag_format="#{}",
+        image_requirements={}
+    )
+}
+
+# Parse hashtag formats and image requirements once, up front
+precompile_rules(_ADAPTATION_RULES)
+
+# Capabilities advertised by every Content & Scheduling Agent
+_CAPABILITIES = (
+    Capability(
+        id="process_and_schedule_post",
+        name="Process and Schedule Post",
+        description="Process social media content and schedule it for publication on multiple platforms",
+        parameters={
+            "user_id": {"type": "string", "description": "User ID"},
+            "raw_text": {"type": "string", "description": "Raw text content"},
+            "image_data": {"type": "string", "description": "Optional base64-encoded image"},
+            "target_platforms": {"type": "array", "items": {"type": "string"}, "description": "Platforms to publish to"},
+            "schedule_time": {"type": "string", "description": "When to publish this post"},
+            "social_media_credentials": {"type": "object", "description": "Social media credentials"}
+        }
+    ),
+    Capability(
+        id="process_and_schedule_posts",
+        name="Process and Schedule Posts",
+        description="Process and schedule several posts in one task, with batched storage and scheduling",
+        parameters={
+            "posts": {
+                "type": "array",
+                "items": {"type": "object"},
+                "description": "Posts, each with the parameters of process_and_schedule_post"
+            }
+        }
+    ),
+    Capability(
+        id="post_status_update",
+        name="Post Status Update",
+        description="Handle updates on the status of posts published to social platforms",
+        parameters={
+            "socialspark_post_id": {"type": "string", "description": "SocialSpark post ID"},
+            "platform": {"type": "string", "description": "Social media platform"},
+            "status": {"type": "string", "description": "Post status"},
+            "platform_post_id": {"type": "string", "description": "Platform-specific post ID"},
+            "error_message": {"type": "string", "description": "Error message if any"}
+        }
+    ),
+)
+
+# Live agents by agent ID, so persisted jobs can find the agent that runs them
+_AGENTS: Dict[str, "ContentSchedulerAgent"] = {}
+
+
+async def _publish_scheduled_post(agent_id: str, post_id: str) -> None:
+    """
+    Scheduler job entry point that publishes a due post.
+    
+    Jobs are pickled into MongoDB by reference, so this must be a module-level
+    function taking only plain arguments rather than a closure or bound method.
+    
+    Args:
+        agent_id: ID of the agent that scheduled the post
+        post_id: ID of the post to publish
+    """
+    agent = _AGENTS.get(agent_id)
+    if agent is None:
+        logging.getLogger("socialspark.content_scheduler").error(
+            f"No running agent {agent_id} to publish post {post_id}"
+        )
+        return
+    await agent._publish_post(post_id)
 
 
 class ContentSchedulerAgent(BaseAgent):
@@ -47,7 +188,8 @@ class ContentSchedulerAgent(BaseAgent):
         port: int = 8001,
         connection_string: str = "mongodb://localhost:27017/",
         db_name: str = "socialspark",
-        media_storage_path: str = "./media"
+        media_storage_path: str = "./media",
+        client: Optional[MongoClient] = None
     ):
         """
         Initialize the Content & Scheduling Agent.
@@ -61,55 +203,35 @@ class ContentSchedulerAgent(BaseAgent):
             connection_string: MongoDB connection string
             db_name: Database name
             media_storage_path: Path to store media files
+            client: Optional pre-built MongoClient shared by storage and the job store
         """
         super().__init__(agent_id, name, description, "0.1.0", base_url, port)
         
         # Set up storage
-        self.task_storage = TaskStorage(connection_string, db_name)
-        self.post_storage = PostStorage(connection_string, db_name)
+        self.task_storage = TaskStorage(connection_string, db_name, client)
+        self.post_storage = PostStorage(connection_string, db_name, client)
         self.media_storage_path = media_storage_path
         
         # Ensure media directory exists
         os.makedirs(self.media_storage_path, exist_ok=True)
         
         # Set up scheduler with MongoDB job store
-        mongo_client = MongoClient(connection_string)
-        jobstore = MongoDBJobStore(
+        mongo_client = client if client is not None else get_mongo_client(connection_string)
+        # The store creates its sparse next_run_time index when the scheduler starts
+        jobstore = BatchedMongoDBJobStore(
             database=db_name, 
             collection='scheduler_jobs', 
-            client=mongo_client,
-            create_index=False
+            client=mongo_client
         )
-        self.scheduler = BackgroundScheduler()
+        self.jobstore = jobstore
+        # Runs on the FastAPI event loop and awaits publications directly;
+        # it is started by the app's startup hook once that loop is running
+        self.scheduler = AsyncIOScheduler(job_defaults=PUBLISH_JOB_DEFAULTS)
         self.scheduler.add_jobstore(jobstore)
+        _AGENTS[agent_id] = self
         
-        # Platform-specific content adaptation rules
-        self.adaptation_rules = {
-            SocialPlatform.TWITTER: ContentAdaptationRules(
-                platform=SocialPlatform.TWITTER,
-                max_text_length=280,
-                hashtag_format="#{}",
-                image_requirements={"max_images": 4}
-            ),
-            SocialPlatform.FACEBOOK: ContentAdaptationRules(
-                platform=SocialPlatform.FACEBOOK,
-                max_text_length=5000,
-                hashtag_format="#{}",
-                image_requirements={}
-            ),
-            SocialPlatform.INSTAGRAM: ContentAdaptationRules(
-                platform=SocialPlatform.INSTAGRAM,
-                max_text_length=2200,
-                hashtag_format="#{}",
-                image_requirements={"required": True}
-            ),
-            SocialPlatform.LINKEDIN: ContentAdaptationRules(
-                platform=SocialPlatform.LINKEDIN,
-                max_text_length=3000,
-                hashtag_format="#{}",
-                image_requirements={}
-            )
-        }
+        # Adaptation rules are static and compiled once at import, so every agent shares them
+        self.adaptation_rules = _ADAPTATION_RULES
         
         # Register capabilities
         self._register_capabilities()
@@ -119,39 +241,13 @@ class ContentSchedulerAgent(BaseAgent):
         
     def _register_capabilities(self):
         """Register this agent's capabilities."""
-        process_schedule_capability = Capability(
-            id="process_and_schedule_post",
-            name="Process and Schedule Post",
-            description="Process social media content and schedule it for publication on multiple platforms",
-            parameters={
-                "user_id": {"type": "string", "description": "User ID"},
-                "raw_text": {"type": "string", "description": "Raw text content"},
-                "image_data": {"type": "string", "description": "Optional base64-encoded image"},
-                "target_platforms": {"type": "array", "items": {"type": "string"}, "description": "Platforms to publish to"},
-                "schedule_time": {"type": "string", "description": "When to publish this post"},
-                "social_media_credentials": {"type": "object", "description": "Social media credentials"}
-            }
-        )
-        
-        post_status_update_capability = Capability(
-            id="post_status_update",
-            name="Post Status Update",
-            description="Handle updates on the status of posts published to social platforms",
-            parameters={
-                "socialspark_post_id": {"type": "string", "description": "SocialSpark post ID"},
-                "platform": {"type": "string", "description": "Social media platform"},
-                "status": {"type": "string", "description": "Post status"},
-                "platform_post_id": {"type": "string", "description": "Platform-specific post ID"},
-                "error_message": {"type": "string", "description": "Error message if any"}
-            }
-        )
-        
-        self.add_capability(process_schedule_capability)
-        self.add_capability(post_status_update_capability)
+        for capability in _CAPABILITIES:
+            self.add_capability(capability)
     
     def _register_task_handlers(self):
         """Register handlers for different task types."""
         self.register_task_handler("process_and_schedule_post", self._handle_process_schedule_post)
+        self.register_task_handler("process_and_schedule_posts", self._handle_process_schedule_posts)
         self.register_task_handler("post_status_update", self._handle_post_status_update)
     
     async def _handle_process_schedule_post(self, task: Task) -> None:
@@ -167,110 +263,75 @@ class ContentSchedulerAgent(BaseAgent):
             if not data_part:
                 raise ValueError("No content data found in task")
                 
-            data = data_part.data
-            user_id = data.get("user_id")
-            raw_text = data.get("raw_text")
-            image_data = data.get("image_data")
-            target_platforms = data.get("target_platforms", [])
-            schedule_time_str = data.get("schedule_time")
-            credentials = data.get("social_media_credentials", {})
-            
-            # Validate required fields
-            if not user_id:
-                raise ValueError("user_id is required")
-            if not raw_text:
-                raise ValueError("raw_text is required")
-            if not target_platforms:
-                raise ValueError("target_platforms is required")
-            if not schedule_time_str:
-                raise ValueError("schedule_time is required")
-                
-            # Parse target platforms
-            platform_list = []
-            for platform_str in target_platforms:
-                try:
-                    platform = SocialPlatform(platform_str.lower())
-                    platform_list.append(platform)
-                except ValueError:
-                    self.logger.warning(f"Unsupported platform: {platform_str}")
-            
-            if not platform_list:
-                raise ValueError("No valid target platforms specified")
-                
-            # Parse schedule time
-            try:
-                schedule_time = datetime.fromisoformat(schedule_time_str.replace('Z', '+00:00'))
-            except ValueError:
-                raise ValueError(f"Invalid schedule time format: {schedule_time_str}")
-                
-            # Generate post ID
-            post_id = generate_id()
+            post = await self._build_post(data_part.data)
+            post_id = post.id
             
-            # Determine content type and save image if present
-            content_type = ContentType.TEXT
-            image_reference = None
-            if image_data:
-                content_type = ContentType.IMAGE
-                image_path = os.path.join(self.media_storage_path, f"{post_id}.jpg")
+            # Save post and task status; they live in different collections,
+            # so the two writes go out concurrently
+            post_saved, _ = await asyncio.gather(
+                self.post_storage.save_post_async(post),
+                self.task_storage.save_task_async(task)
+            )
+            if not post_saved:
+                raise ValueError(f"Failed to save post {post_id}")
                 
-                # Base64 decode and save image
-                from src.core.utils import decode_image
-                if decode_image(image_data, image_path):
-                    image_reference = image_path
-                else:
-                    self.logger.error(f"Failed to save image for post {post_id}")
+            # Schedule publication
+            self._schedule_post_publication(post)
             
-            # Create scheduled post
-            post = ScheduledPost(
-                id=post_id,
-                user_id=user_id,
-                raw_text=raw_text,
-                content_type=content_type,
-                image_reference=image_reference,
-                target_platforms=[p.value for p in platform_list],
-                schedule_time=schedule_time,
-                status=PostStatus.SCHEDULED
-            )
+            self.logger.info("Successfully processed and scheduled post %s", post_id)
             
-            # Store credentials if provided
-            if credentials:
-                post.credentials = credentials
+            # Update task metadata
+            if not task.metadata:
+                task.metadata = {}
+            task.metadata["post_id"] = post_id
+            task.metadata["schedule_time"] = post.schedule_time.isoformat()
             
-            # Process and adapt content for each target platform
-            for platform in platform_list:
-                rules = self.adaptation_rules.get(platform)
-                if not rules:
-                    self.logger.warning(f"No adaptation rules for platform {platform.value}")
-                    continue
-                    
-                # Adapt content
-                adapted_content = adapt_content_for_platform(
-                    raw_text=raw_text,
-                    image_reference=image_reference,
-                    platform=platform,
-                    rules=rules
-                )
+        except Exception as e:
+            self.logger.error(f"Error processing task {task.id}: {str(e)}")
+            if not task.metadata:
+                task.metadata = {}
+            task.metadata["error"] = str(e)
+            task.update_status(TaskStatus.FAILED)
+    
+    async def _handle_process_schedule_posts(self, task: Task) -> None:
+        """
+        Handle a task that processes and schedules several posts at once.
+        
+        The posts are saved with one bulk write and their publication jobs
+        are added to the job store with another.
+        
+        Args:
+            task: The task to process
+        """
+        try:
+            # Extract data parts
+            data_part = extract_data_part_by_content_type(task.data_parts, "application/json")
+            if not data_part:
+                raise ValueError("No content data found in task")
+                
+            posts_data = data_part.data.get("posts")
+            if not posts_data:
+                raise ValueError("posts is required")
                 
-                # Store adapted content
-                post.platform_specific_content[platform.value] = adapted_content
+            posts = [await self._build_post(post_data) for post_data in posts_data]
             
-            # Save post
-            if not self.post_storage.save_post(post):
-                raise ValueError(f"Failed to save post {post_id}")
+            # Save posts and task status concurrently
+            posts_saved, _ = await asyncio.gather(
+                self.post_storage.bulk_save_posts_async(posts),
+                self.task_storage.save_task_async(task)
+            )
+            if not posts_saved:
+                raise ValueError(f"Failed to save {len(posts)} posts")
                 
             # Schedule publication
-            self._schedule_post_publication(post)
-            
-            # Save task status
-            self.task_storage.save_task(task)
+            self.bulk_schedule(posts)
             
-            self.logger.info(f"Successfully processed and scheduled post {post_id}")
+            self.logger.info("Successfully processed and scheduled %s posts", len(posts))
             
             # Update task metadata
             if not task.metadata:
                 task.metadata = {}
-            task.metadata["post_id"] = post_id
-            task.metadata["schedule_time"] = schedule_time.isoformat()
+            task.metadata["post_ids"] = [post.id for post in posts]
             
         except Exception as e:
             self.logger.error(f"Error processing task {task.id}: {str(e)}")
@@ -278,6 +339,84 @@ class ContentSchedulerAgent(BaseAgent):
                 task.metadata = {}
             task.metadata["error"] = str(e)
             task.update_status(TaskStatus.FAILED)
+    
+    async def _build_post(self, data: Dict[str, Any]) -> ScheduledPost:
+        """
+        Validate post data and build the scheduled post with its adapted content.
+        
+        Args:
+            data: Post data from a process and schedule task
+            
+        Returns:
+            The scheduled post, not yet saved
+            
+        Raises:
+            ValueError: If the post data is invalid
+        """
+        # Validate and coerce all fields in one pass
+        request = ProcessScheduleRequest.model_validate(data)
+        user_id = request.user_id
+        raw_text = request.raw_text
+        image_data = request.image_data
+        platform_list = request.target_platforms
+        schedule_time = request.schedule_time
+        credentials = request.social_media_credentials
+            
+        # Generate post ID
+        post_id = generate_id()
+        
+        # Determine content type and save image if present
+        content_type = ContentType.TEXT
+        image_reference = None
+        if image_data:
+            content_type = ContentType.IMAGE
+            # Name the file after the payload so reposting an image reuses the stored copy
+            image_key = hashlib.sha256(image_data.encode()).hexdigest()[:32]
+            image_path = os.path.join(self.media_storage_path, f"{image_key}.jpg")
+            
+            # Base64 decode and save image off the event loop, unless already stored
+            if await asyncio.to_thread(_store_image, image_data, image_path):
+                image_reference = image_path
+            else:
+                self.logger.error(f"Failed to save image for post {post_id}")
+        
+        # Create scheduled post
+        post = ScheduledPost(
+            id=post_id,
+            user_id=user_id,
+            raw_text=raw_text,
+            content_type=content_type,
+            image_reference=image_reference,
+            target_platforms=platform_list,
+            schedule_time=schedule_time,
+            status=PostStatus.SCHEDULED
+        )
+        
+        # Store credentials if provided
+        if credentials:
+            post.credentials = credentials
+        
+        # Collect the rules for each target platform
+        platforms_rules = []
+        for platform in platform_list:
+            rules = self.adaptation_rules.get(platform)
+            if not rules:
+                self.logger.warning(f"No adaptation rules for platform {platform.value}")
+                continue
+            platforms_rules.append((platform, rules))
+        
+        # Adapt content for all platforms at once, sharing the hashtag extraction
+        adapted_contents = adapt_content_for_platforms(
+            raw_text=raw_text,
+            image_reference=image_reference,
+            platforms_rules=platforms_rules
+        )
+        
+        # Store adapted content
+        for (platform, _), adapted_content in zip(platforms_rules, adapted_contents):
+            post.platform_specific_content[platform.value] = adapted_content
+        
+        return post
             
     def _schedule_post_publication(self, post: ScheduledPost) -> None:
         """
@@ -288,26 +427,33 @@ class ContentSchedulerAgent(BaseAgent):
         """
         job_id = f"publish_post_{post.id}"
         
-        # This is a special function that can be called from a background thread
-        # but will execute the async _publish_post in the FastAPI event loop
-        def publish_post_wrapper(post_id):
-            # Store this post_id for async processing when FastAPI is running
-            if not hasattr(self, '_publish_queue'):
-                self._publish_queue = []
-            self._publish_queue.append(post_id)
-            self.logger.info(f"Queued post {post_id} for publication (will be processed when FastAPI is running)")
-        
-        # Schedule the job with the wrapper function
         self.scheduler.add_job(
-            publish_post_wrapper,
+            _publish_scheduled_post,
             'date',
             run_date=post.schedule_time,
-            args=[post.id],
+            args=[self.agent_id, post.id],
             id=job_id,
             replace_existing=True
         )
         
-        self.logger.info(f"Scheduled post {post.id} for publication at {post.schedule_time}")
+        self.logger.info("Scheduled post %s for publication at %s", post.id, post.schedule_time)
+        
+    def bulk_schedule(self, posts: List[ScheduledPost]) -> None:
+        """
+        Schedule several posts for publication with a single job store write.
+        
+        Args:
+            posts: The posts to schedule
+        """
+        # Each job is added through the scheduler as usual, so it is validated and
+        # EVENT_JOB_ADDED fires; the job store defers the writes to one bulk write
+        with self.jobstore.batch_writes():
+            for post in posts:
+                self._schedule_post_publication(post)
+        
+        if self.scheduler.running:
+            # The jobs were only written on leaving the block; recompute the next wakeup with them in place
+            self.scheduler.wakeup()
         
     async def _publish_post(self, post_id: str) -> None:
         """
@@ -317,66 +463,76 @@ class ContentSchedulerAgent(BaseAgent):
             post_id: ID of the post to publish
         """
         # Load post
-        post = self.post_storage.get_post(post_id)
+        post = await self.post_storage.get_post_async(post_id)
         if not post:
             self.logger.error(f"Post {post_id} not found for publication")
             return
             
-        # Update status
+        # Update status; only the changed fields are written
         post.status = PostStatus.PUBLISHED
-        post.updated_at = datetime.now()
-        self.post_storage.save_post(post)
+        await self.post_storage.update_status_async(post_id, post.status)
         
-        # Publish to each platform
-        for platform in post.target_platforms:
-            platform_enum = SocialPlatform(platform)
-            platform_content = post.platform_specific_content.get(platform)
-            
-            if not platform_content:
-                self.logger.warning(f"No content for platform {platform} in post {post_id}")
-                continue
-                
-            # Determine target agent ID
-            target_agent_id = f"{platform.lower()}-posting-agent"
+        # Publish to all platforms concurrently so one slow platform doesn't delay the others
+        results = await asyncio.gather(
+            *(self._publish_to_platform(post, platform) for platform in post.target_platforms),
+            return_exceptions=True
+        )
+        for platform, result in zip(post.target_platforms, results):
+            if isinstance(result, Exception):
+                target_agent_id = _POSTING_AGENT_IDS[platform]
+                self.logger.error(f"Error sending publish task for post {post_id} to {target_agent_id}: {str(result)}")
+    
+    async def _publish_to_platform(self, post: ScheduledPost, platform: SocialPlatform) -> None:
+        """
+        Send a publish task for a post to one platform's posting agent.
+        
+        Args:
+            post: The post to publish
+            platform: Target platform
+        """
+        post_id = post.id
+        platform_content = post.platform_specific_content.get(platform.value)
+        
+        if not platform_content:
+            self.logger.warning(f"No content for platform {platform.value} in post {post_id}")
+            return
             
-            # Prepare data part
-            data = {
-                "user_id": post.user_id,
-                "platform_specific_content": {
-                    "text": platform_content.text,
-                    "image_reference": platform_content.image_reference,
-                    "hashtags": platform_content.hashtags,
-                    "metadata": platform_content.metadata
-                },
-                f"{platform.lower()}_token": "PLACEHOLDER_TOKEN",  # This would come from credentials storage
-                "socialspark_post_id": post_id
+        # Determine target agent ID
+        target_agent_id = _POSTING_AGENT_IDS[platform]
+        
+        # Prepare data part
+        data = {
+            "user_id": post.user_id,
+            "platform_specific_content": {
+                "text": platform_content.text,
+                "image_reference": platform_content.image_reference,
+                "hashtags": platform_content.hashtags,
+                "metadata": platform_content.metadata
+            },
+            _TOKEN_FIELDS[platform]: "PLACEHOLDER_TOKEN",  # This would come from credentials storage
+            "socialspark_post_id": post_id
+        }
+        
+        # Add platform-specific credentials
+        extract_fields = _CREDENTIAL_EXTRACTORS.get(platform)
+        if extract_fields is not None and post.credentials:
+            data.update(extract_fields(post.credentials.get(platform.value, {})))
+        
+        data_parts = [
+            {
+                "id": generate_id(),
+                "content_type": "application/json",
+                "data": data
             }
-            
-            # Add platform-specific credentials
-            if platform.lower() == "facebook" and hasattr(post, "credentials") and post.credentials:
-                # Extract Facebook-specific credentials if available
-                fb_credentials = post.credentials.get("facebook", {})
-                if fb_credentials.get("page_id"):
-                    data["facebook_page_id"] = fb_credentials.get("page_id")
-            
-            data_parts = [
-                {
-                    "id": generate_id(),
-                    "content_type": "application/json",
-                    "data": data
-                }
-            ]
-            
-            # Send task to platform posting agent
-            try:
-                await self.send_task(
-                    target_agent_id=target_agent_id,
-                    task_type="publish_post",
-                    data_parts=data_parts
-                )
-                self.logger.info(f"Sent publish task for post {post_id} to {target_agent_id}")
-            except Exception as e:
-                self.logger.error(f"Error sending publish task for post {post_id} to {target_agent_id}: {str(e)}")
+        ]
+        
+        # Send task to platform posting agent
+        await self.send_task(
+            target_agent_id=target_agent_id,
+            task_type="publish_post",
+            data_parts=data_parts
+        )
+        self.logger.info("Sent publish task for post %s to %s", post_id, target_agent_id)
     
     async def _handle_post_status_update(self, task: Task) -> None:
         """
@@ -406,26 +562,27 @@ class ContentSchedulerAgent(BaseAgent):
             if not status:
                 raise ValueError("status is required")
                 
-            # Load post
-            post = self.post_storage.get_post(post_id)
-            if not post:
+            # The platform becomes part of a field path, so only accept known platforms
+            platform = SocialPlatform(platform).value
+                
+            # Update post with platform post ID if successful
+            updates = {"updated_at": datetime.now(timezone.utc)}
+            if status == "success" and platform_post_id:
+                updates[f"platform_post_ids.{platform}"] = platform_post_id
+            
+            # Write only the changed fields instead of reloading and replacing the post
+            if not await self.post_storage.update_fields_async(post_id, updates):
                 self.logger.error(f"Post {post_id} not found for status update")
                 return
                 
-            # Update post with platform post ID if successful
             if status == "success" and platform_post_id:
-                post.platform_post_ids[platform] = platform_post_id
-                self.logger.info(f"Post {post_id} successfully published to {platform} with ID {platform_post_id}")
+                self.logger.info("Post %s successfully published to %s with ID %s", post_id, platform, platform_post_id)
             elif status == "failure":
                 self.logger.error(f"Failed to publish post {post_id} to {platform}: {error_message}")
                 # Could implement retry logic here
             
-            # Update post
-            post.updated_at = datetime.now()
-            self.post_storage.save_post(post)
-            
             # Save task
-            self.task_storage.save_task(task)
+            await self.task_storage.save_task_async(task)
             
         except Exception as e:
             self.logger.error(f"Error processing task {task.id}: {str(e)}")
@@ -435,17 +592,37 @@ class ContentSchedulerAgent(BaseAgent):
             task.update_status(TaskStatus.FAILED)
     
     def start(self) -> None:
-        """Start the agent and the scheduler."""
-        # Start the background scheduler
+        """Start the agent and the scheduler; must be called on the running event loop."""
         if not self.scheduler.running:
             self.scheduler.start()
             
-        # Initialize the publish queue if it doesn't exist
-        if not hasattr(self, '_publish_queue'):
-            self._publish_queue = []
-            
         self.logger.info(f"Started {self.name} at {self.agent_url}")
         
+    def shutdown(self) -> None:
+        """Stop the scheduler without waiting for running jobs."""
+        if self.scheduler.running:
+            try:
+                self.scheduler.shutdown(wait=False)
+            except RuntimeError:
+                # The scheduler's event loop is already closed, so nothing is left to stop
+                pass
+        
+    def _prepare_to_serve(self) -> None:
+        """Register the hooks that run the scheduler alongside the FastAPI app."""
+        app = self.app
+        
+        @app.on_event("startup")
+        async def start_scheduler():
+            """Warm up the async MongoDB pool, then start the scheduler on the FastAPI event loop."""
+            await self.post_storage.warmup_async()
+            await self.task_storage.warmup_async()
+            self.start()
+        
+        @app.on_event("shutdown")
+        async def stop_scheduler():
+            """Stop the scheduler while its event loop is still running."""
+            self.shutdown()
+        
     def run(self, host: str = "0.0.0.0") -> None:
         """
         Run the agent's API server and start the scheduler.
@@ -453,41 +630,19 @@ class ContentSchedulerAgent(BaseAgent):
         Args:
             host: Host to bind to, defaults to 0.0.0.0 (all interfaces)
         """
-        # Start the agent and scheduler
-        self.start()
+        self._prepare_to_serve()
         
-        # Register a startup event to process the queue
-        from fastapi import FastAPI
-        app = self.app
+        # Run the FastAPI app
+        super().run(host)
+    
+    async def run_async(self, host: str = "0.0.0.0") -> None:
+        """
+        Run the agent's API server on the current event loop and start the scheduler.
         
-        @app.on_event("startup")
-        async def process_publish_queue():
-            """Process any posts that were scheduled while FastAPI was starting up."""
-            self.logger.info("FastAPI started, processing queued posts...")
-            if hasattr(self, '_publish_queue') and self._publish_queue:
-                for post_id in list(self._publish_queue):
-                    try:
-                        await self._publish_post(post_id)
-                        self._publish_queue.remove(post_id)
-                    except Exception as e:
-                        self.logger.error(f"Error processing queued post {post_id}: {e}")
-            
-            # Set up a background task to periodically check for new items in the queue
-            import asyncio
-            
-            async def check_queue_periodically():
-                while True:
-                    await asyncio.sleep(30)  # Check every 30 seconds
-                    if hasattr(self, '_publish_queue') and self._publish_queue:
-                        for post_id in list(self._publish_queue):
-                            try:
-                                await self._publish_post(post_id)
-                                self._publish_queue.remove(post_id)
-                            except Exception as e:
-                                self.logger.error(f"Error processing queued post {post_id}: {e}")
-            
-            # Start the background task
-            asyncio.create_task(check_queue_periodically())
+        Args:
+            host: Host to bind to, defaults to 0.0.0.0 (all interfaces)
+        """
+        self._prepare_to_serve()
         
-        # Run the FastAPI app
-        super().run(host) 
\ No newline at end of file
+        # Serve the FastAPI app
+        await super().run_async(host)
@@ -0,0 +1,120 @@
+"""
+Job store for the Content & Scheduling Agent.
+
+This module provides the APScheduler job store used to persist scheduled publications.
+"""
+
+import pickle
+import contextlib
+from typing import Dict, Optional
+
+from bson.binary import Binary
+from pymongo import ASCENDING, ReplaceOne
+from apscheduler.jobstores.mongodb import MongoDBJobStore
+from apscheduler.util import datetime_to_utc_timestamp
+
+
+# Maximum number of due jobs loaded into memory per scheduler wakeup
+DUE_JOBS_BATCH_SIZE = 500
+
+
+class BatchedMongoDBJobStore(MongoDBJobStore):
+    """
+    MongoDB job store that loads due jobs in bounded batches.
+    
+    The stock store unpickles every due job on each wakeup, so a large
+    backlog (e.g. after downtime) is materialized at once. Here each wakeup
+    loads at most batch_size jobs in next_run_time order; any remaining due
+    jobs make get_next_run_time() return a past time, so the scheduler
+    wakes again immediately and picks up the next batch.
+    """
+    
+    def __init__(self, batch_size: int = DUE_JOBS_BATCH_SIZE, **kwargs):
+        """
+        Initialize the job store.
+        
+        Args:
+            batch_size: Maximum number of due jobs to load per wakeup
+            **kwargs: Arguments passed through to MongoDBJobStore
+        """
+        super().__init__(**kwargs)
+        self.batch_size = batch_size
+        # Jobs added inside a batch_writes() block, by ID, waiting for its bulk write; None outside one
+        self._batched_jobs: Optional[Dict[str, object]] = None
+    
+    def shutdown(self):
+        """Leave the client open; it is shared and closed by its owner."""
+    
+    @contextlib.contextmanager
+    def batch_writes(self):
+        """
+        Collect the jobs added inside the block and store them with one bulk write on exit.
+        
+        Jobs are still added through the scheduler's add_job(), so its
+        validation and EVENT_JOB_ADDED apply; only the store write is
+        deferred. Inside the block an add is an upsert: a job whose ID is
+        already stored is replaced. Nested blocks join the outermost one.
+        """
+        if self._batched_jobs is not None:
+            yield
+            return
+        
+        self._batched_jobs = {}
+        try:
+            yield
+        finally:
+            # Jobs added before an error were already announced, so they are written regardless
+            jobs, self._batched_jobs = self._batched_jobs, None
+            self.add_jobs(list(jobs.values()))
+    
+    def add_job(self, job):
+        """Store a job, or hold it for the bulk write of an open batch_writes() block."""
+        if self._batched_jobs is None:
+            return super().add_job(job)
+        self._batched_jobs[job.id] = job
+    
+    def add_jobs(self, jobs):
+        """
+        Add or replace several jobs with one unordered bulk write.
+        
+        Args:
+            jobs: Jobs to store; existing jobs with the same IDs are replaced
+        """
+        operations = [
+            ReplaceOne(
+                {"_id": job.id},
+                {
+                    "next_run_time": datetime_to_utc_timestamp(job.next_run_time),
+                    "job_state": Binary(pickle.dumps(job.__getstate__(), self.pickle_protocol)),
+                },
+                upsert=True
+            )
+            for job in jobs
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+    
+    def get_due_jobs(self, now):
+        """Get up to batch_size jobs due at or before now, earliest first."""
+        timestamp = datetime_to_utc_timestamp(now)
+        return self._get_jobs({"next_run_time": {"$lte": timestamp}}, limit=self.batch_size)
+    
+    def _get_jobs(self, conditions, limit=0):
+        """Load matching jobs in run time order; a limit of 0 means no limit."""
+        jobs = []
+        failed_job_ids = []
+        cursor = self.collection.find(
+            conditions, ["_id", "job_state"], sort=[("next_run_time", ASCENDING)], limit=limit
+        )
+        for document in cursor:
+            try:
+                jobs.append(self._reconstitute_job(document["job_state"]))
+            except BaseException:
+                self._logger.exception('Unable to restore job "%s" -- removing it', document["_id"])
+                failed_job_ids.append(document["_id"])
+        
+        # Remove all the jobs we failed to restore
+        if failed_job_ids:
+            self.collection.delete_many({"_id": {"$in": failed_job_ids}})
+        
+        return jobs
@@ -4,10 +4,14 @@ Content & Scheduling Agent models.
 This module defines data models specific to the Content & Scheduling Agent.
 """
 
+import logging
 from enum import Enum
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+logger = logging.getLogger("socialspark.content_scheduler.models")
 
 
 class ContentType(str, Enum):
@@ -38,6 +42,8 @@ class SocialPlatform(str, Enum):
 
 class PlatformSpecificContent(BaseModel):
     """Content adapted for a specific platform."""
+    model_config = ConfigDict(frozen=True)
+    
     platform: SocialPlatform = Field(..., description="Target social media platform")
     text: str = Field(..., description="Platform-specific text content")
     image_reference: Optional[str] = Field(None, description="Reference to image, if any")
@@ -70,8 +76,38 @@ class ScheduledPost(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
 
 
+class ProcessScheduleRequest(BaseModel):
+    """Validated data of a process and schedule post task."""
+    user_id: str = Field(..., min_length=1, description="ID of the user who owns this post")
+    raw_text: str = Field(..., min_length=1, description="Original text content")
+    image_data: Optional[str] = Field(None, description="Optional base64-encoded image")
+    target_platforms: List[SocialPlatform] = Field(..., min_length=1, description="Platforms to publish to")
+    schedule_time: datetime = Field(..., description="When to publish this post")
+    social_media_credentials: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict, description="Platform-specific credentials (e.g. page_id for Facebook)"
+    )
+    
+    @field_validator("target_platforms", mode="before")
+    @classmethod
+    def _drop_unsupported_platforms(cls, value: Any) -> Any:
+        """Lowercase platform names and drop the ones that aren't supported."""
+        if not isinstance(value, list):
+            return value
+        platforms = []
+        for platform_str in value:
+            try:
+                platforms.append(SocialPlatform(str(platform_str).lower()))
+            except ValueError:
+                logger.warning(f"Unsupported platform: {platform_str}")
+        if value and not platforms:
+            raise ValueError("No valid target platforms specified")
+        return platforms
+
+
 class ContentAdaptationRules(BaseModel):
     """Rules for adapting content to different platforms."""
+    model_config = ConfigDict(frozen=True)
+    
     platform: SocialPlatform = Field(..., description="Target platform")
     max_text_length: int = Field(..., description="Maximum text length for this platform")
     hashtag_format: str = Field(..., description="How hashtags should be formatted")
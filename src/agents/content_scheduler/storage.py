@@ -5,32 +5,221 @@ This module provides persistence for scheduled posts.
 """
 
 import logging
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import threading
+from functools import cached_property
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Any, Set, Tuple, Union
+from datetime import datetime, timezone
+
+from cachetools import TTLCache
+from pymongo import MongoClient, ReplaceOne, ReturnDocument, IndexModel, ASCENDING, DESCENDING
 
 from src.core.storage import MongoStorage
-from src.agents.content_scheduler.models import ScheduledPost, PostStatus, PlatformSpecificContent
+from src.core.utils import parse_iso_datetime
+from src.agents.content_scheduler.models import (
+    ScheduledPost, PostStatus, PlatformSpecificContent, ContentType, SocialPlatform
+)
+
+
+# Indexes on the posts collection. Each matches one query shape below (filter,
+# then sort), so the planner answers it with a bounded index scan and no
+# in-memory sort. status_schedule_user also carries user_id and _id so the
+# upcoming posts query is covered and never reads the documents themselves.
+POST_INDEXES = [
+    IndexModel(
+        [("status", ASCENDING), ("schedule_time", ASCENDING), ("user_id", ASCENDING), ("_id", ASCENDING)],
+        name="status_schedule_user"
+    ),
+    IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_recent")
+]
+
+# Fields returned for upcoming posts; all of them are in the status_schedule_user
+# index, so the query is answered from the index alone
+UPCOMING_POST_PROJECTION = {"_id": 1, "schedule_time": 1, "user_id": 1}
+
+# Fields returned when only due post IDs are needed, also covered by status_schedule_user
+DUE_POST_PROJECTION = {"_id": 1, "schedule_time": 1}
+
+# ScheduledPost datetime fields, stored as native BSON dates in UTC
+_DATETIME_POST_FIELDS = ("schedule_time", "created_at", "updated_at")
+
+# ScheduledPost fields that _post_to_dict stores without conversion
+_PLAIN_POST_FIELDS = tuple(
+    field for field in ScheduledPost.model_fields
+    if field not in ("content_type", "status", "platform_specific_content") + _DATETIME_POST_FIELDS
+)
+
+# Enum members by stored value, so reads convert with a dict lookup instead of an enum call
+_STATUS_BY_VALUE = {status.value: status for status in PostStatus}
+_CONTENT_TYPE_BY_VALUE = {content_type.value: content_type for content_type in ContentType}
+_PLATFORM_BY_VALUE = {platform.value: platform for platform in SocialPlatform}
+
+# Size and lifetime of the in-process cache of recently read or saved posts
+POST_CACHE_SIZE = 10_000
+POST_CACHE_TTL = 60
+
+# Documents fetched per round trip when iterating over post queries
+POST_CURSOR_BATCH_SIZE = 50
+
+# Posts per bulk write; the driver splits oversized commands itself, this bounds
+# how many converted documents are held in memory at once
+POST_BULK_WRITE_BATCH_SIZE = 1000
+
+
+def _to_stored_datetime(value: datetime) -> datetime:
+    """
+    Convert a datetime to UTC for storage as a BSON date.
+    
+    BSON dates carry no offset and are read back as UTC, so an aware
+    datetime is converted to UTC and a naive one is taken as local time,
+    like the values datetime.now() returns.
+    
+    Args:
+        value: Datetime to store
+        
+    Returns:
+        Aware datetime in UTC
+    """
+    return value.astimezone(timezone.utc)
+
+
+def _stored_datetime(value: Union[datetime, str]) -> datetime:
+    """
+    Convert a stored date back to an aware datetime.
+    
+    Args:
+        value: BSON date as decoded by the driver, or an ISO 8601 string from an older document
+        
+    Returns:
+        Aware datetime; BSON dates come back in UTC
+    """
+    if isinstance(value, str):
+        # Older documents hold isoformat() strings, naive ones in local time
+        return parse_iso_datetime(value).astimezone(timezone.utc)
+    # The clients aren't tz_aware, so the driver returns BSON dates as naive UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
 
 
 class PostStorage(MongoStorage):
     """
     Storage for scheduled posts.
     
-    Provides persistence for scheduled posts across agent restarts.
+    Provides persistence for scheduled posts across agent restarts. Posts
+    read or saved through this storage are kept in a write-through cache,
+    so the publish and status update paths skip the database on a hit.
     """
     
-    def __init__(self, connection_string: str, db_name: str = "socialspark"):
+    # Collections whose indexes were already ensured by this process
+    _indexes_ensured: Set[str] = set()
+    _indexes_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        connection_string: str,
+        db_name: str = "socialspark",
+        client: Optional[MongoClient] = None
+    ):
         """
         Initialize post storage.
         
         Args:
             connection_string: MongoDB connection string
             db_name: Database name
+            client: Optional pre-built sync client to share instead of creating one
         """
-        super().__init__(connection_string, db_name)
-        self.collection = self.db["posts"]
+        super().__init__(connection_string, db_name, client)
+        # The sync collection is only bound when a sync method first needs it
         self.async_collection = self.async_db["posts"]
         
+        # The sync methods may be called from worker threads as well as the event loop
+        self._cache = TTLCache(maxsize=POST_CACHE_SIZE, ttl=POST_CACHE_TTL)
+        self._cache_lock = threading.Lock()
+    
+    @cached_property
+    def collection(self):
+        """Sync posts collection, with its indexes ensured on first use."""
+        collection = self.db["posts"]
+        self._ensure_indexes(collection)
+        return collection
+    
+    def _ensure_indexes(self, collection) -> None:
+        """
+        Create the posts indexes, issuing the command once per collection per process.
+        
+        Args:
+            collection: Sync posts collection
+        """
+        with self._indexes_lock:
+            if collection.full_name in self._indexes_ensured:
+                return
+            try:
+                # Creating indexes that already exist with the same keys is a no-op
+                collection.create_indexes(POST_INDEXES)
+                self._indexes_ensured.add(collection.full_name)
+            except Exception as e:
+                self.logger.error(f"Error creating indexes on {collection.full_name}: {e}")
+    
+    async def _ensure_indexes_async(self) -> None:
+        """Create the posts indexes through the async client, once per collection per process."""
+        full_name = self.async_collection.full_name
+        if full_name in self._indexes_ensured:
+            return
+        try:
+            await self.async_collection.create_indexes(POST_INDEXES)
+            with self._indexes_lock:
+                self._indexes_ensured.add(full_name)
+        except Exception as e:
+            self.logger.error(f"Error creating indexes on {full_name}: {e}")
+    
+    async def warmup_async(self) -> bool:
+        """
+        Warm up the async pool, then make sure the posts indexes exist.
+        
+        Returns:
+            True if the server answered, False otherwise
+        """
+        if not await super().warmup_async():
+            return False
+        await self._ensure_indexes_async()
+        return True
+        
+    def _cache_get(self, post_id: str) -> Optional[ScheduledPost]:
+        """
+        Get a copy of a cached post.
+        
+        Args:
+            post_id: ID of the post
+            
+        Returns:
+            Copy of the cached post, or None on a miss
+        """
+        with self._cache_lock:
+            post = self._cache.get(post_id)
+        # Callers mutate the posts they get, so never hand out the cached object
+        return post.model_copy(deep=True) if post is not None else None
+    
+    def _cache_put(self, post: ScheduledPost) -> None:
+        """
+        Cache a copy of a post.
+        
+        Args:
+            post: Post to cache
+        """
+        post = post.model_copy(deep=True)
+        with self._cache_lock:
+            self._cache[post.id] = post
+    
+    def _cache_discard(self, post_id: str) -> None:
+        """
+        Drop a post from the cache.
+        
+        Args:
+            post_id: ID of the post
+        """
+        with self._cache_lock:
+            self._cache.pop(post_id, None)
+        
     def _post_to_dict(self, post: ScheduledPost) -> Dict[str, Any]:
         """
         Convert a ScheduledPost to a dictionary for MongoDB storage.
@@ -41,34 +230,36 @@ class PostStorage(MongoStorage):
         Returns:
             Dictionary representation of the post
         """
-        post_dict = post.dict()
-        
-        # Convert datetime objects to strings
-        post_dict["schedule_time"] = post.schedule_time.isoformat()
-        post_dict["created_at"] = post.created_at.isoformat()
-        post_dict["updated_at"] = post.updated_at.isoformat()
+        # Copy the fields stored as-is, then add the converted ones, in one pass
+        post_dict = {field: getattr(post, field) for field in _PLAIN_POST_FIELDS}
+        post_dict["_id"] = post.id
+        for field in _DATETIME_POST_FIELDS:
+            post_dict[field] = _to_stored_datetime(getattr(post, field))
         
         # Convert enum values to strings
         post_dict["content_type"] = post.content_type.value
         post_dict["status"] = post.status.value
         
-        # Convert platform specific content to a serializable format
-        platform_specific_content = {}
-        for platform, content in post.platform_specific_content.items():
-            platform_specific_content[platform] = content.dict()
-        post_dict["platform_specific_content"] = platform_specific_content
-        
-        # Use post.id as MongoDB _id
-        post_dict["_id"] = post.id
+        # Platform content models hold only plain values, so a shallow copy of their fields suffices
+        post_dict["platform_specific_content"] = {
+            platform: dict(content.__dict__)
+            for platform, content in post.platform_specific_content.items()
+        }
         
         return post_dict
     
-    def _dict_to_post(self, post_dict: Dict[str, Any]) -> ScheduledPost:
+    def _dict_to_post(self, post_dict: Dict[str, Any], trusted: bool = True) -> ScheduledPost:
         """
         Convert a dictionary from MongoDB to a ScheduledPost.
         
+        Documents in the posts collection were written by _post_to_dict from
+        an already validated post, so by default they are rebuilt with
+        model_construct and only the fields stored as strings are converted
+        back, skipping a full validation pass on every read.
+        
         Args:
             post_dict: Dictionary to convert
+            trusted: Whether the dictionary came from this storage; pass False to fully validate it
             
         Returns:
             ScheduledPost object
@@ -77,30 +268,34 @@ class PostStorage(MongoStorage):
         if "_id" in post_dict:
             post_dict["id"] = post_dict.pop("_id")
         
-        # Convert string dates to datetime objects
-        if isinstance(post_dict.get("schedule_time"), str):
-            post_dict["schedule_time"] = datetime.fromisoformat(post_dict["schedule_time"])
-        if isinstance(post_dict.get("created_at"), str):
-            post_dict["created_at"] = datetime.fromisoformat(post_dict["created_at"])
-        if isinstance(post_dict.get("updated_at"), str):
-            post_dict["updated_at"] = datetime.fromisoformat(post_dict["updated_at"])
+        # Dates are stored natively; documents written before that still hold ISO strings
+        for field in _DATETIME_POST_FIELDS:
+            if field in post_dict:
+                post_dict[field] = _stored_datetime(post_dict[field])
         
         # Convert platform specific content
         platform_specific_content = {}
         for platform, content_dict in post_dict.get("platform_specific_content", {}).items():
-            platform_specific_content[platform] = PlatformSpecificContent(**content_dict)
+            if trusted:
+                content_dict["platform"] = _PLATFORM_BY_VALUE[content_dict["platform"]]
+                platform_specific_content[platform] = PlatformSpecificContent.model_construct(**content_dict)
+            else:
+                platform_specific_content[platform] = PlatformSpecificContent(**content_dict)
         post_dict["platform_specific_content"] = platform_specific_content
         
         # Convert string status to enum
         if isinstance(post_dict.get("status"), str):
-            post_dict["status"] = PostStatus(post_dict["status"])
+            post_dict["status"] = _STATUS_BY_VALUE[post_dict["status"]]
             
         # Convert string content type to enum
         if isinstance(post_dict.get("content_type"), str):
-            from src.agents.content_scheduler.models import ContentType
-            post_dict["content_type"] = ContentType(post_dict["content_type"])
+            post_dict["content_type"] = _CONTENT_TYPE_BY_VALUE[post_dict["content_type"]]
         
-        return ScheduledPost(**post_dict)
+        if not trusted:
+            return ScheduledPost(**post_dict)
+        
+        post_dict["target_platforms"] = [_PLATFORM_BY_VALUE[p] for p in post_dict.get("target_platforms", [])]
+        return ScheduledPost.model_construct(**post_dict)
     
     def save_post(self, post: ScheduledPost) -> bool:
         """
@@ -115,6 +310,7 @@ class PostStorage(MongoStorage):
         try:
             post_dict = self._post_to_dict(post)
             result = self.collection.replace_one({"_id": post.id}, post_dict, upsert=True)
+            self._cache_put(post)
             return True
         except Exception as e:
             self.logger.error(f"Error saving post {post.id}: {e}")
@@ -133,11 +329,171 @@ class PostStorage(MongoStorage):
         try:
             post_dict = self._post_to_dict(post)
             result = await self.async_collection.replace_one({"_id": post.id}, post_dict, upsert=True)
+            self._cache_put(post)
             return True
         except Exception as e:
             self.logger.error(f"Error saving post {post.id} asynchronously: {e}")
             return False
     
+    def _replace_operations(self, posts: List[ScheduledPost]) -> List[ReplaceOne]:
+        """
+        Build the upserts that store a batch of posts.
+        
+        Args:
+            posts: Posts to store
+            
+        Returns:
+            One ReplaceOne per post
+        """
+        return [
+            ReplaceOne({"_id": post.id}, self._post_to_dict(post), upsert=True)
+            for post in posts
+        ]
+    
+    def bulk_save_posts(self, posts: List[ScheduledPost]) -> bool:
+        """
+        Save several posts to the database in unordered batches.
+        
+        Posts are written POST_BULK_WRITE_BATCH_SIZE at a time, and a failing
+        post doesn't stop the others in its batch.
+        
+        Args:
+            posts: Posts to save
+            
+        Returns:
+            True if every post was saved, False otherwise
+        """
+        try:
+            for start in range(0, len(posts), POST_BULK_WRITE_BATCH_SIZE):
+                batch = posts[start:start + POST_BULK_WRITE_BATCH_SIZE]
+                self.collection.bulk_write(self._replace_operations(batch), ordered=False)
+                for post in batch:
+                    self._cache_put(post)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving {len(posts)} posts: {e}")
+            return False
+    
+    async def bulk_save_posts_async(self, posts: List[ScheduledPost]) -> bool:
+        """
+        Save several posts to the database in unordered batches asynchronously.
+        
+        Posts are written POST_BULK_WRITE_BATCH_SIZE at a time, and a failing
+        post doesn't stop the others in its batch.
+        
+        Args:
+            posts: Posts to save
+            
+        Returns:
+            True if every post was saved, False otherwise
+        """
+        try:
+            for start in range(0, len(posts), POST_BULK_WRITE_BATCH_SIZE):
+                batch = posts[start:start + POST_BULK_WRITE_BATCH_SIZE]
+                await self.async_collection.bulk_write(self._replace_operations(batch), ordered=False)
+                for post in batch:
+                    self._cache_put(post)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving {len(posts)} posts asynchronously: {e}")
+            return False
+    
+    def update_fields(self, post_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Set individual fields of a stored post without rewriting the whole document.
+        
+        Values must already be in their stored form (e.g. enum values rather than members).
+        
+        Args:
+            post_id: ID of the post to update
+            updates: Field paths mapped to their new values
+            
+        Returns:
+            True if the post was found, False otherwise
+        """
+        self._cache_discard(post_id)
+        try:
+            result = self.collection.update_one({"_id": post_id}, {"$set": updates})
+            return result.matched_count > 0
+        except Exception as e:
+            self.logger.error(f"Error updating post {post_id}: {e}")
+            return False
+    
+    async def update_fields_async(self, post_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Set individual fields of a stored post asynchronously.
+        
+        Values must already be in their stored form (e.g. enum values rather than members).
+        
+        Args:
+            post_id: ID of the post to update
+            updates: Field paths mapped to their new values
+            
+        Returns:
+            True if the post was found, False otherwise
+        """
+        self._cache_discard(post_id)
+        try:
+            result = await self.async_collection.update_one({"_id": post_id}, {"$set": updates})
+            return result.matched_count > 0
+        except Exception as e:
+            self.logger.error(f"Error updating post {post_id} asynchronously: {e}")
+            return False
+    
+    def update_status(self, post_id: str, status: PostStatus, **fields: Any) -> bool:
+        """
+        Set a post's status and updated_at, plus any other fields, in one round trip.
+        
+        Only the post's _id is sent back, not the whole document.
+        
+        Args:
+            post_id: ID of the post to update
+            status: New status
+            **fields: Other fields to set, already in their stored form
+            
+        Returns:
+            True if the post was found, False otherwise
+        """
+        self._cache_discard(post_id)
+        try:
+            result = self.collection.find_one_and_update(
+                {"_id": post_id},
+                {"$set": {"status": status.value, "updated_at": datetime.now(timezone.utc), **fields}},
+                projection={"_id": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            return result is not None
+        except Exception as e:
+            self.logger.error(f"Error updating status of post {post_id}: {e}")
+            return False
+    
+    async def update_status_async(self, post_id: str, status: PostStatus, **fields: Any) -> bool:
+        """
+        Set a post's status and updated_at, plus any other fields, asynchronously.
+        
+        Only the post's _id is sent back, not the whole document.
+        
+        Args:
+            post_id: ID of the post to update
+            status: New status
+            **fields: Other fields to set, already in their stored form
+            
+        Returns:
+            True if the post was found, False otherwise
+        """
+        self._cache_discard(post_id)
+        try:
+            result = await self.async_collection.find_one_and_update(
+                {"_id": post_id},
+                {"$set": {"status": status.value, "updated_at": datetime.now(timezone.utc), **fields}},
+                projection={"_id": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            return result is not None
+        except Exception as e:
+            self.logger.error(f"Error updating status of post {post_id} asynchronously: {e}")
+            return False
+    
     def get_post(self, post_id: str) -> Optional[ScheduledPost]:
         """
         Get a post by ID.
@@ -148,11 +504,16 @@ class PostStorage(MongoStorage):
         Returns:
             ScheduledPost if found, None otherwise
         """
+        post = self._cache_get(post_id)
+        if post is not None:
+            return post
         try:
             post_dict = self.collection.find_one({"_id": post_id})
             if not post_dict:
                 return None
-            return self._dict_to_post(post_dict)
+            post = self._dict_to_post(post_dict)
+            self._cache_put(post)
+            return post
         except Exception as e:
             self.logger.error(f"Error getting post {post_id}: {e}")
             return None
@@ -167,15 +528,44 @@ class PostStorage(MongoStorage):
         Returns:
             ScheduledPost if found, None otherwise
         """
+        post = self._cache_get(post_id)
+        if post is not None:
+            return post
         try:
             post_dict = await self.async_collection.find_one({"_id": post_id})
             if not post_dict:
                 return None
-            return self._dict_to_post(post_dict)
+            post = self._dict_to_post(post_dict)
+            self._cache_put(post)
+            return post
         except Exception as e:
             self.logger.error(f"Error getting post {post_id} asynchronously: {e}")
             return None
     
+    def iter_posts_by_status(
+        self, status: PostStatus, limit: int = 100
+    ) -> Iterator[ScheduledPost]:
+        """
+        Iterate over posts by status, fetching them from the server in batches.
+        
+        Posts are converted only as the caller consumes them, so stopping
+        early skips converting the rest.
+        
+        Args:
+            status: Status to filter by
+            limit: Maximum number of posts to retrieve
+            
+        Yields:
+            Scheduled posts
+        """
+        try:
+            cursor = self.collection.find({"status": status.value}).sort("schedule_time", 1).limit(limit)
+            with cursor.batch_size(POST_CURSOR_BATCH_SIZE):
+                for post_dict in cursor:
+                    yield self._dict_to_post(post_dict)
+        except Exception as e:
+            self.logger.error(f"Error getting posts by status {status}: {e}")
+    
     def get_posts_by_status(
         self, status: PostStatus, limit: int = 100
     ) -> List[ScheduledPost]:
@@ -190,15 +580,36 @@ class PostStorage(MongoStorage):
             List of scheduled posts
         """
         try:
-            posts = []
+            # The caller wants the whole page, so fetch it in one reply and skip per-document yields
             cursor = self.collection.find({"status": status.value}).sort("schedule_time", 1).limit(limit)
-            for post_dict in cursor:
-                posts.append(self._dict_to_post(post_dict))
-            return posts
+            return [self._dict_to_post(post_dict) for post_dict in list(cursor.batch_size(limit))]
         except Exception as e:
             self.logger.error(f"Error getting posts by status {status}: {e}")
             return []
     
+    async def iter_posts_by_status_async(
+        self, status: PostStatus, limit: int = 100
+    ) -> AsyncIterator[ScheduledPost]:
+        """
+        Iterate over posts by status asynchronously, fetching them from the server in batches.
+        
+        Args:
+            status: Status to filter by
+            limit: Maximum number of posts to retrieve
+            
+        Yields:
+            Scheduled posts
+        """
+        cursor = self.async_collection.find({"status": status.value}).sort("schedule_time", 1).limit(limit)
+        cursor.batch_size(POST_CURSOR_BATCH_SIZE)
+        try:
+            async for post_dict in cursor:
+                yield self._dict_to_post(post_dict)
+        except Exception as e:
+            self.logger.error(f"Error getting posts by status {status} asynchronously: {e}")
+        finally:
+            await cursor.close()
+    
     async def get_posts_by_status_async(
         self, status: PostStatus, limit: int = 100
     ) -> List[ScheduledPost]:
@@ -213,15 +624,157 @@ class PostStorage(MongoStorage):
             List of scheduled posts
         """
         try:
-            posts = []
+            # The caller wants the whole page, so fetch it in one reply and convert it in one go
             cursor = self.async_collection.find({"status": status.value}).sort("schedule_time", 1).limit(limit)
-            async for post_dict in cursor:
-                posts.append(self._dict_to_post(post_dict))
-            return posts
+            post_dicts = await cursor.batch_size(limit).to_list(length=limit or None)
+            return [self._dict_to_post(post_dict) for post_dict in post_dicts]
         except Exception as e:
             self.logger.error(f"Error getting posts by status {status} asynchronously: {e}")
             return []
     
+    def _upcoming_query(self, horizon: datetime) -> Dict[str, Any]:
+        """
+        Build the filter for scheduled posts due at or before a horizon.
+        
+        schedule_time is stored as a BSON date in UTC, so the horizon is
+        converted the same way: an aware horizon to UTC, a naive one taken
+        as local time first.
+        
+        Args:
+            horizon: Latest schedule time to include
+            
+        Returns:
+            MongoDB filter
+        """
+        return {
+            "status": PostStatus.SCHEDULED.value,
+            "schedule_time": {"$lte": _to_stored_datetime(horizon)}
+        }
+    
+    @staticmethod
+    def _upcoming_summary(post_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a projected upcoming post document to a summary.
+        
+        Args:
+            post_dict: Document with the UPCOMING_POST_PROJECTION fields
+            
+        Returns:
+            Summary with id, user_id and schedule_time
+        """
+        return {
+            "id": post_dict["_id"],
+            "user_id": post_dict["user_id"],
+            "schedule_time": _stored_datetime(post_dict["schedule_time"])
+        }
+    
+    def get_upcoming_posts(self, horizon: datetime, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get summaries of scheduled posts due at or before a horizon, soonest first.
+        
+        Args:
+            horizon: Latest schedule time to include
+            limit: Maximum number of posts to retrieve
+            
+        Returns:
+            List of post summaries with id, user_id and schedule_time
+        """
+        try:
+            cursor = self.collection.find(
+                self._upcoming_query(horizon), UPCOMING_POST_PROJECTION
+            ).sort("schedule_time", 1).limit(limit)
+            return [self._upcoming_summary(post_dict) for post_dict in cursor]
+        except Exception as e:
+            self.logger.error(f"Error getting upcoming posts: {e}")
+            return []
+    
+    async def get_upcoming_posts_async(self, horizon: datetime, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get summaries of scheduled posts due at or before a horizon asynchronously.
+        
+        Args:
+            horizon: Latest schedule time to include
+            limit: Maximum number of posts to retrieve
+            
+        Returns:
+            List of post summaries with id, user_id and schedule_time
+        """
+        try:
+            cursor = self.async_collection.find(
+                self._upcoming_query(horizon), UPCOMING_POST_PROJECTION
+            ).sort("schedule_time", 1).limit(limit)
+            return [self._upcoming_summary(post_dict) async for post_dict in cursor]
+        except Exception as e:
+            self.logger.error(f"Error getting upcoming posts asynchronously: {e}")
+            return []
+    
+    def list_due_post_ids(self, now: datetime, limit: int = 100) -> List[Tuple[str, datetime]]:
+        """
+        Get the IDs of scheduled posts due at or before a time, soonest first.
+        
+        The query is covered by the status_schedule_user index and no post is
+        built, so callers can load just the posts they go on to dispatch.
+        
+        Args:
+            now: Latest schedule time to include
+            limit: Maximum number of posts to retrieve
+            
+        Returns:
+            List of (post ID, schedule time) tuples
+        """
+        try:
+            cursor = self.collection.find(
+                self._upcoming_query(now), DUE_POST_PROJECTION
+            ).sort("schedule_time", 1).limit(limit)
+            return [(post_dict["_id"], _stored_datetime(post_dict["schedule_time"])) for post_dict in cursor]
+        except Exception as e:
+            self.logger.error(f"Error listing due posts: {e}")
+            return []
+    
+    async def list_due_post_ids_async(self, now: datetime, limit: int = 100) -> List[Tuple[str, datetime]]:
+        """
+        Get the IDs of scheduled posts due at or before a time asynchronously.
+        
+        Args:
+            now: Latest schedule time to include
+            limit: Maximum number of posts to retrieve
+            
+        Returns:
+            List of (post ID, schedule time) tuples
+        """
+        try:
+            cursor = self.async_collection.find(
+                self._upcoming_query(now), DUE_POST_PROJECTION
+            ).sort("schedule_time", 1).limit(limit)
+            return [(post_dict["_id"], _stored_datetime(post_dict["schedule_time"])) async for post_dict in cursor]
+        except Exception as e:
+            self.logger.error(f"Error listing due posts asynchronously: {e}")
+            return []
+    
+    def iter_posts_by_user(
+        self, user_id: str, limit: int = 100
+    ) -> Iterator[ScheduledPost]:
+        """
+        Iterate over posts by user, fetching them from the server in batches.
+        
+        Posts are converted only as the caller consumes them, so stopping
+        early skips converting the rest.
+        
+        Args:
+            user_id: User ID to filter by
+            limit: Maximum number of posts to retrieve
+            
+        Yields:
+            Scheduled posts
+        """
+        try:
+            cursor = self.collection.find({"user_id": user_id}).sort("created_at", -1).limit(limit)
+            with cursor.batch_size(POST_CURSOR_BATCH_SIZE):
+                for post_dict in cursor:
+                    yield self._dict_to_post(post_dict)
+        except Exception as e:
+            self.logger.error(f"Error getting posts by user {user_id}: {e}")
+    
     def get_posts_by_user(
         self, user_id: str, limit: int = 100
     ) -> List[ScheduledPost]:
@@ -236,15 +789,36 @@ class PostStorage(MongoStorage):
             List of scheduled posts
         """
         try:
-            posts = []
+            # The caller wants the whole page, so fetch it in one reply and skip per-document yields
             cursor = self.collection.find({"user_id": user_id}).sort("created_at", -1).limit(limit)
-            for post_dict in cursor:
-                posts.append(self._dict_to_post(post_dict))
-            return posts
+            return [self._dict_to_post(post_dict) for post_dict in list(cursor.batch_size(limit))]
         except Exception as e:
             self.logger.error(f"Error getting posts by user {user_id}: {e}")
             return []
     
+    async def iter_posts_by_user_async(
+        self, user_id: str, limit: int = 100
+    ) -> AsyncIterator[ScheduledPost]:
+        """
+        Iterate over posts by user asynchronously, fetching them from the server in batches.
+        
+        Args:
+            user_id: User ID to filter by
+            limit: Maximum number of posts to retrieve
+            
+        Yields:
+            Scheduled posts
+        """
+        cursor = self.async_collection.find({"user_id": user_id}).sort("created_at", -1).limit(limit)
+        cursor.batch_size(POST_CURSOR_BATCH_SIZE)
+        try:
+            async for post_dict in cursor:
+                yield self._dict_to_post(post_dict)
+        except Exception as e:
+            self.logger.error(f"Error getting posts by user {user_id} asynchronously: {e}")
+        finally:
+            await cursor.close()
+    
     async def get_posts_by_user_async(
         self, user_id: str, limit: int = 100
     ) -> List[ScheduledPost]:
@@ -259,11 +833,10 @@ class PostStorage(MongoStorage):
             List of scheduled posts
         """
         try:
-            posts = []
+            # The caller wants the whole page, so fetch it in one reply and convert it in one go
             cursor = self.async_collection.find({"user_id": user_id}).sort("created_at", -1).limit(limit)
-            async for post_dict in cursor:
-                posts.append(self._dict_to_post(post_dict))
-            return posts
+            post_dicts = await cursor.batch_size(limit).to_list(length=limit or None)
+            return [self._dict_to_post(post_dict) for post_dict in post_dicts]
         except Exception as e:
             self.logger.error(f"Error getting posts by user {user_id} asynchronously: {e}")
             return []
@@ -278,6 +851,7 @@ class PostStorage(MongoStorage):
         Returns:
             True if successful, False otherwise
         """
+        self._cache_discard(post_id)
         try:
             result = self.collection.delete_one({"_id": post_id})
             return result.deleted_count > 0
@@ -295,6 +869,7 @@ class PostStorage(MongoStorage):
         Returns:
             True if successful, False otherwise
         """
+        self._cache_discard(post_id)
         try:
             result = await self.async_collection.delete_one({"_id": post_id})
             return result.deleted_count > 0
@@ -6,17 +6,83 @@ This agent is responsible for publishing content to Facebook.
 
 import os
 import json
+import asyncio
 import logging
 import base64
+import itertools
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+
+from pymongo import MongoClient
 
 from src.core.agent import BaseAgent
 from src.core.models import Task, DataPart, Capability, TaskStatus
-from src.core.utils import create_data_part, generate_id, extract_data_part_by_content_type
+from src.core.utils import extract_data_part_by_content_type, generate_id, utc_now_iso
 from src.core.storage import TaskStorage
 
 from src.agents.platform_posting.facebook.api_client import FacebookApiClient
+from src.agents.platform_posting.facebook.models import PublishPostRequest, FetchAnalyticsRequest
+
+
+# IDs for data parts of the tasks this agent creates: a random per-process
+# prefix plus a counter. PIDs alone collide across containers, where every
+# agent runs as PID 1, so the prefix is random and redrawn in forked children
+_part_counter = itertools.count()
+_part_id_prefix = os.urandom(8).hex()
+
+
+def _refresh_part_id_prefix() -> None:
+    """Give a forked child its own data part ID prefix."""
+    global _part_id_prefix
+    _part_id_prefix = os.urandom(8).hex()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_refresh_part_id_prefix)
+
+
+def _part_id() -> str:
+    """
+    Generate an ID for a data part of an outgoing task.
+    
+    Parts added to tasks owned by other agents use generate_id() instead.
+    
+    Returns:
+        ID unique within this process, and across processes with high probability
+    """
+    return f"{_part_id_prefix}-{next(_part_counter):x}"
+
+
+# Capabilities advertised by every Facebook Posting Agent
+_CAPABILITIES = (
+    Capability(
+        id="publish_post",
+        name="Publish Post to Facebook",
+        description="Publishes content to Facebook",
+        parameters={
+            "user_id": {"type": "string", "description": "User ID"},
+            "platform_specific_content": {
+                "type": "object", 
+                "description": "Content specifically adapted for Facebook",
+                "properties": {
+                    "text": {"type": "string", "description": "Text content"},
+                    "image_reference": {"type": "string", "description": "Reference to image, if any"},
+                    "hashtags": {"type": "array", "items": {"type": "string"}, "description": "Hashtags for this post"}
+                }
+            },
+            "facebook_token": {"type": "string", "description": "OAuth token for Facebook"},
+            "socialspark_post_id": {"type": "string", "description": "SocialSpark internal post ID"}
+        }
+    ),
+    Capability(
+        id="fetch_platform_analytics",
+        name="Fetch Facebook Analytics",
+        description="Retrieves engagement analytics for a Facebook post",
+        parameters={
+            "platform_post_id": {"type": "string", "description": "Facebook post ID"},
+            "facebook_token": {"type": "string", "description": "OAuth token for Facebook"}
+        }
+    ),
+)
 
 
 class FacebookPostingAgent(BaseAgent):
@@ -34,7 +100,8 @@ class FacebookPostingAgent(BaseAgent):
         base_url: str = "http://localhost",
         port: int = 8002,
         connection_string: str = "mongodb://localhost:27017/",
-        db_name: str = "socialspark_facebook_agent"
+        db_name: str = "socialspark_facebook_agent",
+        client: Optional[MongoClient] = None
     ):
         """
         Initialize the Facebook Posting Agent.
@@ -47,15 +114,21 @@ class FacebookPostingAgent(BaseAgent):
             port: Port for this agent's API
             connection_string: MongoDB connection string
             db_name: Database name for this agent
+            client: Optional pre-built MongoClient to use for storage
         """
         super().__init__(agent_id, name, description, "0.1.0", base_url, port)
         
         # Set up storage
-        self.task_storage = TaskStorage(connection_string, db_name)
+        self.task_storage = TaskStorage(connection_string, db_name, client)
         
         # API client
         self.api_client = FacebookApiClient()
         
+        @self.app.on_event("startup")
+        async def warmup_storage():
+            """Warm up the async MongoDB pool before the first task arrives."""
+            await self.task_storage.warmup_async()
+        
         # Register capabilities
         self._register_capabilities()
         
@@ -64,38 +137,8 @@ class FacebookPostingAgent(BaseAgent):
     
     def _register_capabilities(self):
         """Register this agent's capabilities."""
-        publish_post_capability = Capability(
-            id="publish_post",
-            name="Publish Post to Facebook",
-            description="Publishes content to Facebook",
-            parameters={
-                "user_id": {"type": "string", "description": "User ID"},
-                "platform_specific_content": {
-                    "type": "object", 
-                    "description": "Content specifically adapted for Facebook",
-                    "properties": {
-                        "text": {"type": "string", "description": "Text content"},
-                        "image_reference": {"type": "string", "description": "Reference to image, if any"},
-                        "hashtags": {"type": "array", "items": {"type": "string"}, "description": "Hashtags for this post"}
-                    }
-                },
-                "facebook_token": {"type": "string", "description": "OAuth token for Facebook"},
-                "socialspark_post_id": {"type": "string", "description": "SocialSpark internal post ID"}
-            }
-        )
-        
-        fetch_analytics_capability = Capability(
-            id="fetch_platform_analytics",
-            name="Fetch Facebook Analytics",
-            description="Retrieves engagement analytics for a Facebook post",
-            parameters={
-                "platform_post_id": {"type": "string", "description": "Facebook post ID"},
-                "facebook_token": {"type": "string", "description": "OAuth token for Facebook"}
-            }
-        )
-        
-        self.add_capability(publish_post_capability)
-        self.add_capability(fetch_analytics_capability)
+        for capability in _CAPABILITIES:
+            self.add_capability(capability)
     
     def _register_task_handlers(self):
         """Register handlers for different task types."""
@@ -115,22 +158,13 @@ class FacebookPostingAgent(BaseAgent):
             if not data_part:
                 raise ValueError("No content data found in task")
                 
-            data = data_part.data
-            user_id = data.get("user_id")
-            content = data.get("platform_specific_content", {})
-            facebook_token = data.get("facebook_token")
-            socialspark_post_id = data.get("socialspark_post_id")
-            facebook_page_id = data.get("facebook_page_id", "me")  # Default to user timeline if no page specified
-            
-            # Validate required fields
-            if not user_id:
-                raise ValueError("user_id is required")
-            if not content:
-                raise ValueError("platform_specific_content is required")
-            if not facebook_token:
-                raise ValueError("facebook_token is required")
-            if not socialspark_post_id:
-                raise ValueError("socialspark_post_id is required")
+            # Validate all fields in one pass
+            request = PublishPostRequest.model_validate(data_part.data)
+            user_id = request.user_id
+            content = request.platform_specific_content
+            facebook_token = request.facebook_token
+            socialspark_post_id = request.socialspark_post_id
+            facebook_page_id = request.facebook_page_id
                 
             # Extract content details
             text = content.get("text")
@@ -151,16 +185,18 @@ class FacebookPostingAgent(BaseAgent):
             if response.get("success"):
                 facebook_post_id = response.get("post_id")
                 
-                await self._send_post_status_update(
-                    socialspark_post_id=socialspark_post_id,
-                    status="success",
-                    platform_post_id=facebook_post_id
-                )
-                
-                await self._send_published_post_report(
-                    socialspark_post_id=socialspark_post_id,
-                    user_id=user_id,
-                    platform_post_id=facebook_post_id
+                # The two agents are independent, so notify them concurrently
+                await asyncio.gather(
+                    self._send_post_status_update(
+                        socialspark_post_id=socialspark_post_id,
+                        status="success",
+                        platform_post_id=facebook_post_id
+                    ),
+                    self._send_published_post_report(
+                        socialspark_post_id=socialspark_post_id,
+                        user_id=user_id,
+                        platform_post_id=facebook_post_id
+                    )
                 )
                 
                 # Update task metadata
@@ -168,7 +204,7 @@ class FacebookPostingAgent(BaseAgent):
                     task.metadata = {}
                 task.metadata["facebook_post_id"] = facebook_post_id
                 
-                self.logger.info(f"Successfully published post {socialspark_post_id} to Facebook")
+                self.logger.info("Successfully published post %s to Facebook", socialspark_post_id)
             else:
                 error_message = response.get("error", "Unknown error")
                 
@@ -186,7 +222,7 @@ class FacebookPostingAgent(BaseAgent):
                 self.logger.error(f"Failed to publish post {socialspark_post_id} to Facebook: {error_message}")
                 
             # Save task
-            self.task_storage.save_task(task)
+            await self.task_storage.save_task_async(task)
             
         except Exception as e:
             self.logger.error(f"Error processing publish task {task.id}: {str(e)}")
@@ -237,7 +273,7 @@ class FacebookPostingAgent(BaseAgent):
             
         data_parts = [
             {
-                "id": generate_id(),
+                "id": _part_id(),
                 "content_type": "application/json",
                 "data": data
             }
@@ -268,12 +304,12 @@ class FacebookPostingAgent(BaseAgent):
             "user_id": user_id,
             "platform": "facebook",
             "platform_post_id": platform_post_id,
-            "publish_time": datetime.now().isoformat()
+            "publish_time": utc_now_iso()
         }
         
         data_parts = [
             {
-                "id": generate_id(),
+                "id": _part_id(),
                 "content_type": "application/json",
                 "data": data
             }
@@ -298,15 +334,10 @@ class FacebookPostingAgent(BaseAgent):
             if not data_part:
                 raise ValueError("No content data found in task")
                 
-            data = data_part.data
-            platform_post_id = data.get("platform_post_id")
-            facebook_token = data.get("facebook_token")
-            
-            # Validate required fields
-            if not platform_post_id:
-                raise ValueError("platform_post_id is required")
-            if not facebook_token:
-                raise ValueError("facebook_token is required")
+            # Validate all fields in one pass
+            request = FetchAnalyticsRequest.model_validate(data_part.data)
+            platform_post_id = request.platform_post_id
+            facebook_token = request.facebook_token
                 
             # Fetch analytics from Facebook
             analytics = await self.api_client.get_post_analytics(
@@ -326,17 +357,19 @@ class FacebookPostingAgent(BaseAgent):
                 "analytics": analytics
             }
             
-            response_data_part = create_data_part(
-                data=response_data,
-                content_type="application/json"
+            # The task belongs to another agent, whose payload refs are keyed on task and part ID
+            response_data_part = DataPart(
+                id=generate_id(),
+                content_type="application/json",
+                data=response_data
             )
             
             task.add_data_part(response_data_part)
             
             # Save task
-            self.task_storage.save_task(task)
+            await self.task_storage.save_task_async(task)
             
-            self.logger.info(f"Successfully fetched analytics for Facebook post {platform_post_id}")
+            self.logger.info("Successfully fetched analytics for Facebook post %s", platform_post_id)
             
         except Exception as e:
             self.logger.error(f"Error fetching analytics for task {task.id}: {str(e)}")
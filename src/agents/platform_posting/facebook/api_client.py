@@ -6,11 +6,25 @@ This module provides a client for interacting with the Facebook Graph API.
 
 import os
 import json
+import time
+import asyncio
+import hashlib
 import logging
+import itertools
 from typing import Dict, List, Optional, Any, Union
-from datetime import datetime
 
 import httpx
+from cachetools import TLRUCache
+
+
+# Verified tokens kept, and how long a verification is trusted; entries also
+# expire TOKEN_EXPIRY_MARGIN seconds before the token itself does
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_CACHE_TTL = 3600
+TOKEN_EXPIRY_MARGIN = 300
+
+# Makes mock post IDs unique even when several are created within one clock tick
+_mock_post_counter = itertools.count()
 
 
 class FacebookApiClient:
@@ -31,6 +45,12 @@ class FacebookApiClient:
         self.api_base_url = f"https://graph.facebook.com/{api_version}"
         self.logger = logging.getLogger("socialspark.facebook.api")
         
+        # Successful verifications by token hash, as (monotonic expiry, result)
+        self._token_cache = TLRUCache(maxsize=TOKEN_CACHE_SIZE, ttu=lambda _key, entry, _now: entry[0])
+        # Verifications in flight by token hash, so concurrent first calls for a
+        # token share one, while calls for other tokens proceed independently
+        self._token_verifications: Dict[str, asyncio.Task] = {}
+        
     async def publish_post(
         self,
         access_token: str,
@@ -54,7 +74,7 @@ class FacebookApiClient:
         Returns:
             Response from the API with success/failure and post ID if successful
         """
-        self.logger.info(f"Publishing post to Facebook page/timeline: {page_id}")
+        self.logger.info("Publishing post to Facebook page/timeline: %s", page_id)
         
         # In a real implementation, this would make an actual API call
         # For development purposes, we'll simulate a successful response
@@ -66,8 +86,8 @@ class FacebookApiClient:
                 "error": "Post must contain message, image, or link"
             }
         
-        # Simulate validating the image path
-        if image_path and not os.path.exists(image_path):
+        # Simulate validating the image path; stat off the event loop, since the media path may be a slow mount
+        if image_path and not await asyncio.to_thread(os.path.exists, image_path):
             return {
                 "success": False,
                 "error": f"Image file not found: {image_path}"
@@ -82,7 +102,7 @@ class FacebookApiClient:
             
         # Simulate a successful post
         # In a real implementation, this would come from the API response
-        post_id = f"fb_mock_{datetime.now().timestamp():.0f}"
+        post_id = f"fb_mock_{time.time_ns()}_{next(_mock_post_counter)}"
         
         return {
             "success": True,
@@ -109,7 +129,7 @@ class FacebookApiClient:
         Returns:
             Analytics data for the post
         """
-        self.logger.info(f"Fetching analytics for Facebook post: {post_id}")
+        self.logger.info("Fetching analytics for Facebook post: %s", post_id)
         
         # Default metrics if none provided
         if not metrics:
@@ -143,7 +163,53 @@ class FacebookApiClient:
         
     async def verify_token(self, access_token: str) -> Dict[str, Any]:
         """
-        Verify a Facebook access token.
+        Verify a Facebook access token, reusing a recent successful verification.
+        
+        Successful results are cached by a hash of the token for up to
+        TOKEN_CACHE_TTL seconds, and never past shortly before the token expires.
+        
+        Args:
+            access_token: Facebook access token to verify
+            
+        Returns:
+            Information about the token if valid
+        """
+        key = hashlib.sha256(access_token.encode()).hexdigest() if access_token else ""
+        entry = self._token_cache.get(key)
+        if entry is not None:
+            return entry[1]
+        
+        verification = self._token_verifications.get(key)
+        if verification is None:
+            verification = asyncio.create_task(self._verify_and_cache(key, access_token))
+            self._token_verifications[key] = verification
+        # Shielded, so a cancelled caller doesn't cancel the verification others are waiting on
+        return await asyncio.shield(verification)
+    
+    async def _verify_and_cache(self, key: str, access_token: str) -> Dict[str, Any]:
+        """
+        Verify a token and cache a successful result, as the one in-flight verification for its key.
+        
+        Args:
+            key: Hash of the token, as used by the cache
+            access_token: Facebook access token to verify
+            
+        Returns:
+            Information about the token if valid
+        """
+        try:
+            result = await self._fetch_token_info(access_token)
+            if result.get("success"):
+                ttl = min(TOKEN_CACHE_TTL, result["expires_at"] - time.time() - TOKEN_EXPIRY_MARGIN)
+                if ttl > 0:
+                    self._token_cache[key] = (time.monotonic() + ttl, result)
+            return result
+        finally:
+            del self._token_verifications[key]
+    
+    async def _fetch_token_info(self, access_token: str) -> Dict[str, Any]:
+        """
+        Ask the API about a Facebook access token.
         
         Note: This is a mock implementation that simulates the API call.
         
@@ -168,7 +234,7 @@ class FacebookApiClient:
             "success": True,
             "app_id": "mock_app_id",
             "user_id": "mock_user_id",
-            "expires_at": (datetime.now().timestamp() + 60 * 60 * 24 * 60),  # 60 days
+            "expires_at": time.time() + 60 * 60 * 24 * 60,  # 60 days
             "is_valid": True,
             "scopes": ["email", "public_profile", "publish_to_groups", "pages_show_list", "pages_manage_posts"]
         } 
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+Facebook Platform Posting Agent models.
+
+This module defines the task data models of the Facebook Posting Agent.
+"""
+
+from typing import Any, Dict
+from pydantic import BaseModel, Field
+
+
+class PublishPostRequest(BaseModel):
+    """Validated data of a publish post task."""
+    user_id: str = Field(..., min_length=1, description="ID of the user who owns the post")
+    platform_specific_content: Dict[str, Any] = Field(
+        ..., min_length=1, description="Content specifically adapted for Facebook"
+    )
+    facebook_token: str = Field(..., min_length=1, description="OAuth token for Facebook")
+    socialspark_post_id: str = Field(..., min_length=1, description="SocialSpark internal post ID")
+    facebook_page_id: str = Field("me", description="Page to post to, defaults to the user's own timeline")
+
+
+class FetchAnalyticsRequest(BaseModel):
+    """Validated data of a fetch analytics task."""
+    platform_post_id: str = Field(..., min_length=1, description="Facebook post ID")
+    facebook_token: str = Field(..., min_length=1, description="OAuth token for Facebook")
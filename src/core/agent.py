@@ -5,16 +5,70 @@ This module provides the base agent class that all specialized agents
 in the SocialSpark ecosystem will inherit from.
 """
 
+import os
 import uuid
+import asyncio
 import logging
+import contextlib
 from typing import Any, Dict, List, Optional, Callable, Awaitable, Union
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, Body, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Body, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from cachetools import TTLCache
+import uvicorn
 
-from src.core.models import AgentCard, Task, DataPart, Capability, TaskStatus
+from src.core.models import AgentCard, Task, TaskBatch, DataPart, Capability, TaskStatus
 from src.core.client import A2AClient
+from src.core.storage import TaskStorage
+from src.core.utils import json_loads
+
+
+# Accepted tasks that may wait for a worker before new ones are refused with a 503
+TASK_QUEUE_SIZE = 1024
+
+# Worker coroutines processing each agent's accepted tasks
+TASK_WORKERS = (os.cpu_count() or 1) * 2
+
+# Recent tasks kept in memory per agent, and for how long; older tasks are
+# looked up in the agent's task storage, if it has one
+TASK_CACHE_SIZE = 10_000
+TASK_CACHE_TTL = 3600
+
+# Statuses by their string value, so updates skip the Enum constructor's lookup
+_STATUS_BY_VALUE = {status.value: status for status in TaskStatus}
+
+
+def _body_validation_error(error: ValidationError, body: Any = None) -> RequestValidationError:
+    """
+    Report a request body that failed validation the way FastAPI reports declared body parameters.
+    
+    Args:
+        error: Validation error raised for the body
+        body: Parsed body, if it was parsed
+        
+    Returns:
+        Error for FastAPI's 422 handler
+    """
+    return RequestValidationError(
+        [{**details, "loc": ("body", *details["loc"])} for details in error.errors(include_url=False)],
+        body=body
+    )
+
+
+class _EmbeddedServer(uvicorn.Server):
+    """
+    uvicorn server that leaves signal handling to its caller.
+    
+    uvicorn normally installs its own SIGINT/SIGTERM handlers while serving,
+    which breaks when several servers share one event loop.
+    """
+    
+    @contextlib.contextmanager
+    def capture_signals(self):
+        yield
 
 
 class BaseAgent:
@@ -57,8 +111,15 @@ class BaseAgent:
         # Task handlers registered by the agent
         self.task_handlers = {}
         
-        # Tasks being processed by this agent
-        self.tasks = {}
+        # Tasks recently received by this agent; bounded, so it doesn't grow with every task ever seen
+        self.tasks = TTLCache(maxsize=TASK_CACHE_SIZE, ttl=TASK_CACHE_TTL)
+        
+        # Persistent task storage, set by agents that save their tasks
+        self.task_storage: Optional[TaskStorage] = None
+        
+        # Accepted tasks waiting for a worker, and the workers, started with the app
+        self._work_queue: asyncio.Queue = asyncio.Queue(maxsize=TASK_QUEUE_SIZE)
+        self._workers: List[asyncio.Task] = []
         
         # A2A client for communicating with other agents
         self.client = A2AClient(agent_id, base_url)
@@ -69,6 +130,9 @@ class BaseAgent:
         # Agent's capabilities
         self.capabilities = []
         
+        # uvicorn server, set while the agent is served via run_async()
+        self.server: Optional[uvicorn.Server] = None
+        
         # Create FastAPI app for this agent
         self.app = self._create_app()
         
@@ -76,6 +140,11 @@ class BaseAgent:
         """Create a FastAPI application for this agent."""
         app = FastAPI(title=f"{self.name} API", description=self.description, version=self.version)
         
+        # Bound once for the endpoints below; the handler table is updated
+        # in place and never replaced
+        handlers = self.task_handlers
+        agent_id = self.agent_id
+        
         # Define agent card endpoint
         @app.get("/card", response_model=AgentCard)
         async def get_agent_card():
@@ -83,33 +152,96 @@ class BaseAgent:
         
         # Define task endpoints
         @app.post("/tasks", status_code=201, response_model=Task)
-        async def create_task(background_tasks: BackgroundTasks, task: Task = Body(...)):
-            return await self._handle_incoming_task(background_tasks, task)
+        async def create_task(request: Request):
+            # Parsed by hand so misrouted tasks are rejected before the Task model is built
+            try:
+                body = json_loads(await request.body())
+            except ValueError as e:
+                raise RequestValidationError([{
+                    "type": "json_invalid",
+                    "loc": ("body",),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": str(e)}
+                }])
+            if isinstance(body, dict):
+                target_agent_id, task_type = body.get("target_agent_id"), body.get("type")
+                if target_agent_id != agent_id or not isinstance(task_type, str) or task_type not in handlers:
+                    # Misrouted; raises with the detailed reason
+                    self._check_task_routing(target_agent_id, task_type)
+            try:
+                task = Task.model_validate(body)
+            except ValidationError as e:
+                raise _body_validation_error(e, body)
+            
+            # Routing was checked above, so the task goes straight to the queue
+            return self._accept_task(task)
+        
+        @app.post("/tasks:batch", status_code=201, response_model=List[Optional[Task]])
+        async def create_tasks(request: Request):
+            # Validated straight from the raw bytes by pydantic-core, without a stdlib json.loads pass
+            try:
+                batch = TaskBatch.model_validate_json(await request.body())
+            except ValidationError as e:
+                raise _body_validation_error(e)
+            
+            return await self._accept_task_batch(batch.tasks)
         
         @app.get("/tasks/{task_id}", response_model=Task)
         async def get_task(task_id: str):
-            if task_id not in self.tasks:
+            task = await self._get_task(task_id)
+            if task is None:
                 raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-            return self.tasks[task_id]
+            return task
         
         @app.patch("/tasks/{task_id}", response_model=Task)
         async def update_task(task_id: str, update_data: Dict[str, Any] = Body(...)):
-            if task_id not in self.tasks:
+            task = await self._get_task(task_id)
+            if task is None:
                 raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
             
-            task = self.tasks[task_id]
+            now = datetime.now()
+            
+            # Reject an unknown status before any field is changed
+            status = update_data.get("status")
+            if isinstance(status, str):
+                status = _STATUS_BY_VALUE.get(status)
+                if status is None:
+                    raise HTTPException(status_code=400, detail=f"Invalid task status: {update_data['status']}")
             
             # Update fields from the request
             for key, value in update_data.items():
                 if hasattr(task, key):
                     if key == "status" and isinstance(value, str):
-                        task.update_status(TaskStatus(value))
+                        task.update_status(status, ts=now)
                     else:
                         setattr(task, key, value)
                     
-            task.updated_at = datetime.now()
+            task.updated_at = now
+            # Any field may have changed, so the task is saved in full
+            if self.task_storage is not None:
+                await self.task_storage.save_task_async(task)
             return task
         
+        @app.on_event("startup")
+        async def start_workers():
+            """Start the task workers on the app's event loop."""
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(TASK_WORKERS)]
+        
+        @app.on_event("shutdown")
+        async def stop_workers():
+            """Let the workers finish the accepted tasks, then stop them."""
+            await self._work_queue.join()
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+        
+        @app.on_event("shutdown")
+        async def close_client():
+            """Close the A2A client's connections while the app's event loop is still running."""
+            await self.client.aclose()
+        
         return app
     
     def get_agent_card(self) -> AgentCard:
@@ -153,12 +285,15 @@ class BaseAgent:
         self.task_handlers[task_type] = handler
         self.logger.info(f"Registered handler for task type: {task_type}")
     
-    async def _handle_incoming_task(self, background_tasks: BackgroundTasks, task: Task) -> Task:
+    async def _handle_incoming_task(self, task: Task) -> Task:
         """
         Handle an incoming task from another agent.
         
+        Accepted tasks are queued for the agent's workers, so at most
+        TASK_WORKERS are processed at once; when TASK_QUEUE_SIZE are already
+        waiting, the task is refused so the sender can back off and retry.
+        
         Args:
-            background_tasks: FastAPI BackgroundTasks for async processing
             task: The task to handle
             
         Returns:
@@ -167,13 +302,45 @@ class BaseAgent:
         Raises:
             HTTPException: If the task is invalid or can't be handled
         """
-        # Validate the task is for this agent
-        if task.target_agent_id != self.agent_id:
-            raise HTTPException(status_code=400, detail=f"Task target {task.target_agent_id} does not match this agent ({self.agent_id})")
+        self._check_task_routing(task.target_agent_id, task.type)
+        return self._accept_task(task)
+    
+    async def _get_task(self, task_id: str) -> Optional[Task]:
+        """
+        Get a task from the task cache, falling back to the agent's task storage.
         
-        # Check if we have a handler for this task type
-        if task.type not in self.task_handlers:
-            raise HTTPException(status_code=400, detail=f"No handler for task type: {task.type}")
+        Args:
+            task_id: ID of the task to get
+            
+        Returns:
+            Task if found, None otherwise
+        """
+        task = self.tasks.get(task_id)
+        if task is None and self.task_storage is not None:
+            # Evicted or never cached here; storage is the source of truth
+            task = await self.task_storage.get_task_async(task_id)
+            if task is not None:
+                self.tasks[task_id] = task
+        return task
+    
+    def _accept_task(self, task: Task) -> Task:
+        """
+        Queue a task whose routing was already checked and mark it in progress.
+        
+        Args:
+            task: The task to accept
+            
+        Returns:
+            The task, now in progress
+            
+        Raises:
+            HTTPException: If the work queue is full
+        """
+        # Queue the task for the workers
+        try:
+            self._work_queue.put_nowait(task)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Task queue is full, retry later")
         
         # Store the task
         self.tasks[task.id] = task
@@ -181,31 +348,119 @@ class BaseAgent:
         # Update status to in progress
         task.update_status(TaskStatus.IN_PROGRESS)
         
-        # Process the task in the background
-        background_tasks.add_task(self._process_task, task)
-        
         return task
     
+    async def _accept_task_batch(self, batch: List[Task]) -> List[Optional[Task]]:
+        """
+        Accept a batch of tasks, storing the accepted ones with a single bulk write.
+        
+        Each task is accepted or rejected on its own. The accepted tasks are
+        written to storage before any of them is queued, so a worker's later
+        status update can never land before, and be overwritten by, the
+        batch write.
+        
+        Args:
+            batch: The tasks to accept, in submission order
+            
+        Returns:
+            Each accepted task, now in progress, or None where the task was rejected
+        """
+        results: List[Optional[Task]] = [None] * len(batch)
+        accepted: List[Task] = []
+        work_queue = self._work_queue
+        free_slots = work_queue.maxsize - work_queue.qsize() if work_queue.maxsize > 0 else len(batch)
+        for index, task in enumerate(batch):
+            try:
+                self._check_task_routing(task.target_agent_id, task.type)
+            except HTTPException as e:
+                self.logger.warning(f"Rejected task {task.id}: {e.detail}")
+                continue
+            if len(accepted) >= free_slots:
+                self.logger.warning(f"Rejected task {task.id}: task queue is full, retry later")
+                continue
+            results[index] = task
+            accepted.append(task)
+        
+        if not accepted:
+            return results
+        
+        now = datetime.now()
+        tasks = self.tasks
+        for task in accepted:
+            tasks[task.id] = task
+            task.update_status(TaskStatus.IN_PROGRESS, ts=now)
+        
+        if self.task_storage is not None:
+            await self.task_storage.bulk_save_tasks_async(accepted)
+        
+        for task in accepted:
+            try:
+                work_queue.put_nowait(task)
+            except asyncio.QueueFull:
+                # Other requests filled the queue during the write; the task is stored already, so wait for room
+                await work_queue.put(task)
+        return results
+    
+    def _check_task_routing(self, target_agent_id: Any, task_type: Any) -> None:
+        """
+        Check that a task is addressed to this agent and has a handler here.
+        
+        Args:
+            target_agent_id: The task's target agent ID
+            task_type: The task's type
+            
+        Raises:
+            HTTPException: If the task is for another agent or of an unknown type
+        """
+        # Validate the task is for this agent
+        if target_agent_id != self.agent_id:
+            raise HTTPException(status_code=400, detail=f"Task target {target_agent_id} does not match this agent ({self.agent_id})")
+        
+        # Check if we have a handler for this task type
+        if not isinstance(task_type, str) or task_type not in self.task_handlers:
+            raise HTTPException(status_code=400, detail=f"No handler for task type: {task_type}")
+    
+    async def _worker(self) -> None:
+        """Process queued tasks one at a time until cancelled."""
+        while True:
+            task = await self._work_queue.get()
+            try:
+                await self._process_task(task)
+            finally:
+                self._work_queue.task_done()
+    
     async def _process_task(self, task: Task) -> None:
         """
         Process a task in the background.
         
+        The final status is saved to the agent's task storage, if it has
+        one; handlers usually saved the task already, so this is typically
+        a status-only update.
+        
         Args:
             task: The task to process
         """
         handler = self.task_handlers[task.type]
+        logger = self.logger
+        # Checked once per task; with INFO off, the log calls below are skipped entirely
+        log_info = logger.isEnabledFor(logging.INFO)
         
         try:
-            self.logger.info(f"Processing task {task.id} of type {task.type}")
+            if log_info:
+                logger.info("Processing task %s of type %s", task.id, task.type)
             await handler(task)
             task.update_status(TaskStatus.COMPLETED)
-            self.logger.info(f"Successfully completed task {task.id}")
+            if log_info:
+                logger.info("Successfully completed task %s", task.id)
         except Exception as e:
-            self.logger.error(f"Error processing task {task.id}: {str(e)}")
+            logger.error(f"Error processing task {task.id}: {str(e)}")
             task.update_status(TaskStatus.FAILED)
             if not task.metadata:
                 task.metadata = {}
             task.metadata["error"] = str(e)
+        
+        if self.task_storage is not None:
+            await self.task_storage.save_task_changes_async(task)
     
     async def send_task(
         self, 
@@ -245,5 +500,40 @@ class BaseAgent:
         Args:
             host: Host to bind to, defaults to 0.0.0.0 (all interfaces)
         """
-        import uvicorn
-        uvicorn.run(self.app, host=host, port=self.port) 
\ No newline at end of file
+        # "auto" picks uvloop and the httptools parser when installed (uvicorn[standard])
+        uvicorn.run(self.app, host=host, port=self.port, loop="auto", http="auto")
+    
+    async def run_async(self, host: str = "0.0.0.0") -> None:
+        """
+        Run this agent's API server on the current event loop.
+        
+        Unlike run(), this allows several agents to share one event loop.
+        Signal handling is left to the caller, which stops the server by
+        calling request_shutdown().
+        
+        Args:
+            host: Host to bind to, defaults to 0.0.0.0 (all interfaces)
+        """
+        config = uvicorn.Config(self.app, host=host, port=self.port)
+        self.server = _EmbeddedServer(config)
+        await self.server.serve()
+    
+    def request_shutdown(self, force: bool = False) -> None:
+        """
+        Ask a server started with run_async() to exit.
+        
+        Args:
+            force: Exit without waiting for open connections and background tasks
+        """
+        if self.server is not None:
+            self.server.should_exit = True
+            if force:
+                self.server.force_exit = True
+    
+    def shutdown(self) -> None:
+        """
+        Release resources held by this agent once its server has stopped.
+        
+        Subclasses that own background workers should override this.
+        """
+        pass
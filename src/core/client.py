@@ -5,15 +5,74 @@ This module provides a client for agents to communicate with each other
 using the Agent2Agent (A2A) protocol.
 """
 
-import uuid
-import json
+import time
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Union
+import importlib.util
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 
 import httpx
+from cachetools import TLRUCache
+from pydantic import TypeAdapter
 
-from src.core.models import AgentCard, Task, DataPart, TaskStatus
+from src.core.models import AgentCard, Task, TaskBatch, DataPart, TaskStatus
+from src.core.utils import generate_id, json_dumps
+
+
+# Request bodies are pre-encoded, so the content type is set explicitly
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# HTTP/2 lets concurrent calls to an agent share one connection; it needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Connection pool shared by all calls from one client
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=2.0)
+
+# Requests a client may have in flight at once, across all agents
+MAX_CONCURRENT_REQUESTS = 32
+
+# Tasks queued for an agent while a request to it is in flight are submitted
+# together, up to TASK_BATCH_MAX_SIZE per request, once that request completes
+TASK_BATCH_MAX_SIZE = 128
+
+# Tasks that may wait for one agent before new ones are refused
+TASK_QUEUE_MAX_SIZE = 1024
+
+# Discovered agent cards kept, and how long one is trusted when the response
+# carries no Cache-Control max-age
+AGENT_CARD_CACHE_SIZE = 1024
+AGENT_CARD_CACHE_TTL = 60.0
+
+# Per-task results of a batch submission; rejected tasks come back as null
+_TASK_BATCH_RESULTS = TypeAdapter(List[Optional[Task]])
+
+
+def _cache_ttl(response: httpx.Response) -> float:
+    """
+    Get how long a response may be cached from its Cache-Control header.
+    
+    Args:
+        response: HTTP response
+        
+    Returns:
+        Seconds to cache for; 0 if the response must not be cached
+    """
+    cache_control = response.headers.get("cache-control")
+    if not cache_control:
+        return AGENT_CARD_CACHE_TTL
+    
+    for directive in cache_control.lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        if name in ("no-store", "no-cache"):
+            return 0.0
+        if name == "max-age":
+            try:
+                return max(float(value.strip('"')), 0.0)
+            except ValueError:
+                break
+    return AGENT_CARD_CACHE_TTL
 
 
 class A2AClient:
@@ -23,35 +82,109 @@ class A2AClient:
     Used by agents to send tasks to other agents and retrieve task status.
     """
     
-    def __init__(self, agent_id: str, base_url: str = "http://localhost:8000"):
+    def __init__(
+        self,
+        agent_id: str,
+        base_url: str = "http://localhost:8000",
+        max_queue_size: int = TASK_QUEUE_MAX_SIZE,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS
+    ):
         """
         Initialize an A2A client.
         
         Args:
             agent_id: ID of the agent using this client
             base_url: Base URL for A2A service, defaults to localhost:8000
+            max_queue_size: Maximum number of tasks waiting to be submitted to one agent
+            max_concurrency: Maximum number of requests in flight at once
         """
         self.agent_id = agent_id
         self.base_url = base_url
+        self.max_queue_size = max_queue_size
         self.logger = logging.getLogger(f"a2a.client.{agent_id}")
+        
+        # Created on first use, so it binds to the event loop that serves the agent
+        self._http: Optional[httpx.AsyncClient] = None
+        # Bounds open sockets when many tasks fan out at once
+        self._request_slots = asyncio.Semaphore(max_concurrency)
+        
+        # Discovered agent cards by agent ID, as (monotonic expiry, card)
+        self._card_cache = TLRUCache(maxsize=AGENT_CARD_CACHE_SIZE, ttu=lambda _key, entry, _now: entry[0])
+        
+        # Tasks waiting to be submitted, with the futures their callers await, by target agent
+        self._queue: Dict[str, List[Tuple[Task, asyncio.Future]]] = {}
+        # Per-target coroutines submitting queued tasks one request at a time, while any are left
+        self._senders: Dict[str, asyncio.Task] = {}
+    
+    def _client(self) -> httpx.AsyncClient:
+        """
+        Get the HTTP client shared by all calls, creating it on first use.
+        
+        Reusing one client keeps connections to other agents alive between
+        calls instead of paying a connection setup for each request.
+        
+        Returns:
+            Shared HTTP client
+        """
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=HTTP_LIMITS,
+                timeout=HTTP_TIMEOUT
+            )
+        return self._http
+    
+    async def aclose(self) -> None:
+        """Submit any queued tasks, then close the shared HTTP client and its connections."""
+        if self._senders:
+            await asyncio.gather(*self._senders.values(), return_exceptions=True)
+        
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the shared client, waiting for a free slot first.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Arguments passed through to httpx.AsyncClient.request
+            
+        Returns:
+            HTTP response
+        """
+        async with self._request_slots:
+            return await self._client().request(method, url, **kwargs)
     
     async def discover_agent(self, agent_id: str) -> Optional[AgentCard]:
         """
         Discover an agent by its ID and retrieve its AgentCard.
         
+        Cards are cached for AGENT_CARD_CACHE_TTL seconds, or for as long
+        as the response's Cache-Control max-age allows.
+        
         Args:
             agent_id: ID of the agent to discover
             
         Returns:
             AgentCard if found, None otherwise
         """
+        entry = self._card_cache.get(agent_id)
+        if entry is not None:
+            return entry[1]
+        
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.base_url}/agents/{agent_id}/card")
-                if response.status_code == 200:
-                    return AgentCard.model_validate(response.json())
-                self.logger.warning(f"Failed to discover agent {agent_id}: {response.text}")
-                return None
+            response = await self._request("GET", f"{self.base_url}/agents/{agent_id}/card")
+            if response.status_code == 200:
+                card = AgentCard.model_validate_json(response.content)
+                ttl = _cache_ttl(response)
+                if ttl > 0:
+                    self._card_cache[agent_id] = (time.monotonic() + ttl, card)
+                return card
+            self.logger.warning(f"Failed to discover agent {agent_id}: {response.text}")
+            return None
         except Exception as e:
             self.logger.error(f"Error discovering agent {agent_id}: {e}")
             return None
@@ -77,7 +210,7 @@ class A2AClient:
         Returns:
             The created Task if successful, None otherwise
         """
-        task_id = str(uuid.uuid4())
+        task_id = generate_id()
         now = datetime.now()
         
         task = Task(
@@ -96,7 +229,9 @@ class A2AClient:
         # Add data parts if provided
         if data_parts:
             for dp_data in data_parts:
-                dp_id = dp_data.get("id", str(uuid.uuid4()))
+                dp_id = dp_data.get("id")
+                if dp_id is None:
+                    dp_id = generate_id()
                 content_type = dp_data.get("content_type", "application/json")
                 data = dp_data.get("data", {})
                 dp_metadata = dp_data.get("metadata")
@@ -107,21 +242,86 @@ class A2AClient:
                     data=data,
                     metadata=dp_metadata
                 )
-                task.add_data_part(data_part)
+                task.add_data_part(data_part, ts=now)
+        
+        # Queue the task for the agent's sender; with nothing in flight it is submitted right away
+        queue = self._queue.setdefault(target_agent_id, [])
+        if len(queue) >= self.max_queue_size:
+            self.logger.warning(f"Failed to create task: queue for {target_agent_id} is full")
+            return None
+        
+        future = asyncio.get_running_loop().create_future()
+        queue.append((task, future))
+        if target_agent_id not in self._senders:
+            self._senders[target_agent_id] = asyncio.create_task(self._run_sender(target_agent_id))
+        return await future
+    
+    async def _run_sender(self, target_agent_id: str) -> None:
+        """
+        Submit a target agent's queued tasks until none are left.
+        
+        Only one request per agent is in flight at a time. Tasks queued
+        meanwhile are submitted together when it completes, so batches stay
+        at a single task under light load and grow with the backlog, without
+        holding any task back to wait for others.
+        
+        Args:
+            target_agent_id: ID of the agent the tasks are for
+        """
+        try:
+            queue = self._queue[target_agent_id]
+            while queue:
+                batch = queue[:TASK_BATCH_MAX_SIZE]
+                del queue[:TASK_BATCH_MAX_SIZE]
+                await self._send_batch(target_agent_id, batch)
+        finally:
+            del self._senders[target_agent_id]
+            for _, future in self._queue.pop(target_agent_id, []):
+                if not future.done():
+                    future.set_result(None)
+    
+    async def _send_batch(self, target_agent_id: str, batch: List[Tuple[Task, asyncio.Future]]) -> None:
+        """
+        Submit tasks to an agent in one request and hand each caller its result.
         
+        A single task is sent to the agent's plain task endpoint, more than
+        one to its batch endpoint.
+        
+        Args:
+            target_agent_id: ID of the agent the tasks are for
+            batch: Tasks paired with the futures their callers await
+        """
+        results: List[Optional[Task]] = [None] * len(batch)
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/agents/{target_agent_id}/tasks",
-                    json=task.model_dump(),
-                )
-                if response.status_code == 201:
-                    return Task.model_validate(response.json())
-                self.logger.warning(f"Failed to create task: {response.text}")
-                return None
+            # Serialized straight from the models, without intermediate dicts
+            if len(batch) == 1:
+                url = f"{self.base_url}/agents/{target_agent_id}/tasks"
+                body = batch[0][0].model_dump_json(fallback=str)
+            else:
+                url = f"{self.base_url}/agents/{target_agent_id}/tasks:batch"
+                body = TaskBatch.model_construct(tasks=[task for task, _ in batch]).model_dump_json(fallback=str)
+            
+            response = await self._request("POST", url, content=body, headers=JSON_HEADERS)
+            if response.status_code == 201 and len(batch) == 1:
+                results = [Task.model_validate_json(response.content)]
+            elif response.status_code == 201:
+                created = _TASK_BATCH_RESULTS.validate_json(response.content)
+                if len(created) == len(batch):
+                    results = created
+                else:
+                    self.logger.warning(
+                        f"Failed to create tasks: expected {len(batch)} results, got {len(created)}"
+                    )
+            else:
+                self.logger.warning(f"Failed to create tasks: {response.text}")
         except Exception as e:
-            self.logger.error(f"Error creating task: {e}")
-            return None
+            self.logger.error(f"Error creating tasks: {e}")
+        
+        for (task, future), result in zip(batch, results):
+            if result is None:
+                self.logger.warning(f"Failed to create task {task.id}")
+            if not future.done():
+                future.set_result(result)
     
     async def get_task_status(self, target_agent_id: str, task_id: str) -> Optional[Task]:
         """
@@ -135,14 +335,14 @@ class A2AClient:
             Updated Task if found, None otherwise
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/agents/{target_agent_id}/tasks/{task_id}"
-                )
-                if response.status_code == 200:
-                    return Task.model_validate(response.json())
-                self.logger.warning(f"Failed to get task status: {response.text}")
-                return None
+            response = await self._request(
+                "GET",
+                f"{self.base_url}/agents/{target_agent_id}/tasks/{task_id}"
+            )
+            if response.status_code == 200:
+                return Task.model_validate_json(response.content)
+            self.logger.warning(f"Failed to get task status: {response.text}")
+            return None
         except Exception as e:
             self.logger.error(f"Error getting task status: {e}")
             return None
@@ -166,15 +366,16 @@ class A2AClient:
             if metadata:
                 update_data["metadata"] = metadata
                 
-            async with httpx.AsyncClient() as client:
-                response = await client.patch(
-                    f"{self.base_url}/agents/{self.agent_id}/tasks/{task_id}",
-                    json=update_data,
-                )
-                if response.status_code == 200:
-                    return Task.model_validate(response.json())
-                self.logger.warning(f"Failed to update task status: {response.text}")
-                return None
+            response = await self._request(
+                "PATCH",
+                f"{self.base_url}/agents/{self.agent_id}/tasks/{task_id}",
+                content=json_dumps(update_data),
+                headers=JSON_HEADERS,
+            )
+            if response.status_code == 200:
+                return Task.model_validate_json(response.content)
+            self.logger.warning(f"Failed to update task status: {response.text}")
+            return None
         except Exception as e:
             self.logger.error(f"Error updating task status: {e}")
             return None 
\ No newline at end of file
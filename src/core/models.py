@@ -8,7 +8,7 @@ between agents in the Agent2Agent (A2A) protocol implementation.
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TaskStatus(str, Enum):
@@ -49,15 +49,22 @@ class Task(BaseModel):
     parent_task_id: Optional[str] = Field(None, description="ID of a parent task, if this is a subtask")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata about this task")
     
-    def add_data_part(self, data_part: DataPart) -> None:
-        """Add a data part to this task."""
+    def add_data_part(self, data_part: DataPart, ts: Optional[datetime] = None) -> None:
+        """Add a data part to this task, updated at ts if given, otherwise now."""
         self.data_parts.append(data_part)
-        self.updated_at = datetime.now()
+        self.updated_at = ts or datetime.now()
     
-    def update_status(self, status: TaskStatus) -> None:
-        """Update the status of this task."""
+    def update_status(self, status: TaskStatus, ts: Optional[datetime] = None) -> None:
+        """Update the status of this task, at ts if given, otherwise now."""
         self.status = status
-        self.updated_at = datetime.now()
+        self.updated_at = ts or datetime.now()
+
+
+class TaskBatch(BaseModel):
+    """
+    Several tasks for the same agent, submitted in one request.
+    """
+    tasks: List[Task] = Field(..., description="Tasks to create, in submission order")
 
 
 class Capability(BaseModel):
@@ -66,6 +73,8 @@ class Capability(BaseModel):
     
     Part of the AgentCard discovery mechanism in A2A.
     """
+    model_config = ConfigDict(frozen=True)
+    
     id: str = Field(..., description="Unique identifier for this capability")
     name: str = Field(..., description="Human-readable name of the capability")
     description: str = Field(..., description="Detailed description of what this capability does")
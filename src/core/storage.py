@@ -4,54 +4,316 @@ Storage utilities for SocialSpark Orchestrator.
 This module provides storage classes for persisting tasks and other data.
 """
 
+import os
+import re
+import asyncio
 import logging
+import threading
 import json
-from typing import Dict, List, Optional, Any, Union
+import importlib.util
+from functools import cached_property
+from typing import Dict, List, Optional, Any, Set, Tuple, Union
 from datetime import datetime
 
+import bson
 import motor.motor_asyncio
-from pymongo import MongoClient
+from cachetools import LRUCache
+from pymongo import MongoClient, ReplaceOne, IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from pymongo.server_api import ServerApi
 from bson.objectid import ObjectId
 
 from src.core.models import Task, TaskStatus, DataPart
+from src.core.utils import json_dumps, parse_iso_datetime
+
+
+# Pin the Stable API version so query and command semantics don't shift
+# across server upgrades (a hedge against planner regressions between
+# MongoDB releases). Not strict: admin commands outside API v1 stay usable.
+STABLE_API = ServerApi("1")
+
+# Connection pool settings for shared clients; every agent's request
+# handlers draw from the same pool, so it is sized above PyMongo's default
+MONGO_POOL_OPTIONS = {
+    "maxPoolSize": 200,
+    "minPoolSize": 10,
+    "maxIdleTimeMS": 60000,
+    "waitQueueTimeoutMS": 5000,
+    "retryWrites": True,
+}
+
+# Indexes on the tasks collection: status_recent serves the status listing
+# (filter on status, newest first) and target_status lookups of an agent's
+# tasks in a given status
+TASK_INDEXES = [
+    IndexModel([("status", ASCENDING), ("updated_at", DESCENDING)], name="status_recent"),
+    IndexModel([("target_agent_id", ASCENDING), ("status", ASCENDING)], name="target_status")
+]
+
+# Fields left out when tasks are listed without their payloads
+TASK_SUMMARY_PROJECTION = {"data_parts": 0}
+
+# Data part payloads larger than this many BSON bytes are stored in the
+# task_payloads collection and referenced from the task, so task documents
+# stay small for status updates and listings
+TASK_PAYLOAD_INLINE_LIMIT = 16 * 1024
+
+# Task statuses by stored value, so reads convert with a dict lookup instead of an enum call
+_STATUS_BY_VALUE = {status.value: status for status in TaskStatus}
+
+# Maximum number of queued single-task saves combined into one bulk write
+TASK_SAVE_BATCH_SIZE = 100
+
+# Tasks whose last saved state is remembered, so later saves can write only the status
+SAVED_TASK_STATE_CACHE_SIZE = 10_000
+
+# Shared sync and async clients keyed by connection string
+_CLIENTS: Dict[str, MongoClient] = {}
+_ASYNC_CLIENTS: Dict[str, motor.motor_asyncio.AsyncIOMotorClient] = {}
+
+# A forked child inherits the parent's clients but must never touch them
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_CLIENTS.clear)
+    os.register_at_fork(after_in_child=_ASYNC_CLIENTS.clear)
+
+
+def mongo_compressors() -> str:
+    """
+    Get the wire protocol compressors to offer the server.
+    
+    zstd and snappy need optional packages, so they are only offered when
+    installed; zlib ships with Python and is always available. The server
+    picks the first one it supports: zstd needs MongoDB 4.2+, snappy 3.4+
+    and zlib 3.6+. With none in common, traffic is sent uncompressed.
+    
+    Returns:
+        Comma-separated compressor names, in order of preference
+    """
+    compressors = []
+    if importlib.util.find_spec("zstandard") is not None:
+        compressors.append("zstd")
+    if importlib.util.find_spec("snappy") is not None:
+        compressors.append("snappy")
+    compressors.append("zlib")
+    return ",".join(compressors)
+
+
+def get_mongo_client(connection_string: str) -> MongoClient:
+    """
+    Get the shared MongoClient for a connection string, creating it on first use.
+    
+    Each MongoClient runs its own pool and monitoring threads, so storages,
+    job stores and agents talking to the same cluster share one. It
+    connects lazily: a client that is never used never opens a socket.
+    
+    Args:
+        connection_string: MongoDB connection string
+        
+    Returns:
+        MongoClient shared by everything in this process using that connection string
+    """
+    client = _CLIENTS.get(connection_string)
+    if client is None:
+        client = MongoClient(
+            connection_string,
+            # Monitoring threads and the pool start on the first operation, not here
+            connect=False,
+            serverSelectionTimeoutMS=5000,
+            server_api=STABLE_API,
+            compressors=mongo_compressors(),
+            **MONGO_POOL_OPTIONS
+        )
+        _CLIENTS[connection_string] = client
+    return client
+
+
+def get_async_mongo_client(connection_string: str) -> motor.motor_asyncio.AsyncIOMotorClient:
+    """
+    Get the shared Motor client for a connection string, creating it on first use.
+    
+    Configured like get_mongo_client(), but with its own pool: Motor and
+    PyMongo clients can't share connections. It also connects lazily, so
+    storages only used synchronously cost no async pool.
+    
+    Args:
+        connection_string: MongoDB connection string
+        
+    Returns:
+        AsyncIOMotorClient shared by everything in this process using that connection string
+    """
+    client = _ASYNC_CLIENTS.get(connection_string)
+    if client is None:
+        client = motor.motor_asyncio.AsyncIOMotorClient(
+            connection_string,
+            connect=False,
+            serverSelectionTimeoutMS=5000,
+            server_api=STABLE_API,
+            compressors=mongo_compressors(),
+            **MONGO_POOL_OPTIONS
+        )
+        _ASYNC_CLIENTS[connection_string] = client
+    return client
+
+
+def close_mongo_clients() -> None:
+    """Close the shared sync and async clients created by this process."""
+    while _CLIENTS:
+        _, client = _CLIENTS.popitem()
+        client.close()
+    while _ASYNC_CLIENTS:
+        _, async_client = _ASYNC_CLIENTS.popitem()
+        async_client.close()
 
 
 class MongoStorage:
     """Base class for MongoDB storage."""
     
-    def __init__(self, connection_string: str, db_name: str = "socialspark"):
+    def __init__(
+        self,
+        connection_string: str,
+        db_name: str = "socialspark",
+        client: Optional[MongoClient] = None
+    ):
         """
         Initialize MongoDB storage.
         
         Args:
             connection_string: MongoDB connection string
             db_name: Database name
+            client: Optional pre-built sync client to share instead of creating one
         """
-        # Create sync client for non-async operations
-        self.client = MongoClient(connection_string)
-        self.db = self.client[db_name]
+        self.connection_string = connection_string
+        self.db_name = db_name
+        # A pre-built sync client is used as is; otherwise the shared one is fetched on first sync use
+        if client is not None:
+            self.client = client
         
-        # Create async client for async operations
-        self.async_client = motor.motor_asyncio.AsyncIOMotorClient(connection_string)
+        # Shared async client for async operations
+        self.async_client = get_async_mongo_client(connection_string)
         self.async_db = self.async_client[db_name]
         
         self.logger = logging.getLogger(f"socialspark.storage.{self.__class__.__name__}")
+    
+    @cached_property
+    def client(self) -> MongoClient:
+        """Shared sync client, fetched on first use so storages only used from async code never open its pool."""
+        return get_mongo_client(self.connection_string)
+    
+    @cached_property
+    def db(self):
+        """Sync handle on the storage's database."""
+        return self.client[self.db_name]
+    
+    async def warmup_async(self) -> bool:
+        """
+        Ping the server through the async client so its pool is ready before the first request.
+        
+        Otherwise the first real operation pays for server selection and the
+        connection handshake. The client then keeps minPoolSize connections open.
+        
+        Returns:
+            True if the server answered, False otherwise
+        """
+        try:
+            await self.async_client.admin.command("ping")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error warming up async MongoDB connection: {e}")
+            return False
 
 
 class TaskStorage(MongoStorage):
     """Storage for A2A tasks."""
     
-    def __init__(self, connection_string: str, db_name: str = "socialspark"):
+    # Collections whose indexes were already ensured by this process
+    _indexes_ensured: Set[str] = set()
+    _indexes_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        connection_string: str,
+        db_name: str = "socialspark",
+        client: Optional[MongoClient] = None
+    ):
         """
         Initialize task storage.
         
         Args:
             connection_string: MongoDB connection string
             db_name: Database name
+            client: Optional pre-built sync client to share instead of creating one
         """
-        super().__init__(connection_string, db_name)
-        self.collection = self.db["tasks"]
+        super().__init__(connection_string, db_name, client)
+        # The sync collections are only bound when a sync method first needs them
         self.async_collection = self.async_db["tasks"]
+        self.async_payload_collection = self.async_db["task_payloads"]
+        
+        # Saves waiting for the next bulk write, in call order: task ID, payload writes,
+        # task replacement, state to remember once saved, and the future the caller awaits
+        self._pending_saves: List[
+            Tuple[str, List[ReplaceOne], ReplaceOne, Tuple[TaskStatus, Any], asyncio.Future]
+        ] = []
+        # Writes pending saves one bulk write at a time, while any are left
+        self._save_writer: Optional[asyncio.Task] = None
+        
+        # Status and _task_fingerprint of each task as last saved by this storage
+        self._saved_state = LRUCache(maxsize=SAVED_TASK_STATE_CACHE_SIZE)
+    
+    @cached_property
+    def collection(self):
+        """Sync tasks collection, with its indexes ensured on first use."""
+        collection = self.db["tasks"]
+        self._ensure_indexes(collection)
+        return collection
+    
+    @cached_property
+    def payload_collection(self):
+        """Sync collection holding data part payloads stored apart from their tasks."""
+        return self.db["task_payloads"]
+    
+    def _ensure_indexes(self, collection) -> None:
+        """
+        Create the tasks indexes, issuing the command once per collection per process.
+        
+        Args:
+            collection: Sync tasks collection
+        """
+        with self._indexes_lock:
+            if collection.full_name in self._indexes_ensured:
+                return
+            try:
+                # Creating indexes that already exist with the same keys is a no-op
+                collection.create_indexes(TASK_INDEXES)
+                self._indexes_ensured.add(collection.full_name)
+            except Exception as e:
+                self.logger.error(f"Error creating indexes on {collection.full_name}: {e}")
+    
+    async def _ensure_indexes_async(self) -> None:
+        """Create the tasks indexes through the async client, once per collection per process."""
+        full_name = self.async_collection.full_name
+        if full_name in self._indexes_ensured:
+            return
+        try:
+            await self.async_collection.create_indexes(TASK_INDEXES)
+            with self._indexes_lock:
+                self._indexes_ensured.add(full_name)
+        except Exception as e:
+            self.logger.error(f"Error creating indexes on {full_name}: {e}")
+    
+    async def warmup_async(self) -> bool:
+        """
+        Warm up the async pool, then make sure the tasks indexes exist.
+        
+        Agents call this at startup, so an agent that only uses the async
+        methods gets its indexes without ever creating a sync client.
+        
+        Returns:
+            True if the server answered, False otherwise
+        """
+        if not await super().warmup_async():
+            return False
+        await self._ensure_indexes_async()
+        return True
     
     def _task_to_dict(self, task: Task) -> Dict[str, Any]:
         """
@@ -63,23 +325,25 @@ class TaskStorage(MongoStorage):
         Returns:
             Dictionary representation of the task
         """
-        task_dict = task.dict()
-        
-        # Convert datetime objects to strings
-        task_dict["created_at"] = task.created_at.isoformat()
-        task_dict["updated_at"] = task.updated_at.isoformat()
+        # JSON mode writes datetimes as ISO 8601 strings and enums as their values
+        task_dict = task.model_dump(mode="json", fallback=str)
         
         # Use task.id as MongoDB _id
-        task_dict["_id"] = task.id
+        task_dict["_id"] = task_dict.pop("id")
         
         return task_dict
     
-    def _dict_to_task(self, task_dict: Dict[str, Any]) -> Task:
+    def _dict_to_task(self, task_dict: Dict[str, Any], trusted: bool = True) -> Task:
         """
         Convert a dictionary from MongoDB to a Task.
         
+        Documents in the tasks collection were written by _task_to_dict from
+        an already validated task, so by default they are rebuilt with
+        model_construct instead of being validated again on every read.
+        
         Args:
             task_dict: Dictionary to convert
+            trusted: Whether the dictionary came from this storage; pass False to fully validate it
             
         Returns:
             Task object
@@ -88,23 +352,111 @@ class TaskStorage(MongoStorage):
         if "_id" in task_dict:
             task_dict["id"] = task_dict.pop("_id")
         
-        # Convert string dates to datetime objects
+        if not trusted:
+            # Validation coerces the ISO dates, status and data parts itself
+            return Task.model_validate(task_dict)
+        
+        # model_construct skips coercion, so convert string dates to datetime objects
         if isinstance(task_dict.get("created_at"), str):
-            task_dict["created_at"] = datetime.fromisoformat(task_dict["created_at"])
+            task_dict["created_at"] = parse_iso_datetime(task_dict["created_at"])
         if isinstance(task_dict.get("updated_at"), str):
-            task_dict["updated_at"] = datetime.fromisoformat(task_dict["updated_at"])
+            task_dict["updated_at"] = parse_iso_datetime(task_dict["updated_at"])
         
         # Convert data_parts dictionaries to DataPart objects
-        data_parts = []
-        for dp_dict in task_dict.get("data_parts", []):
-            data_parts.append(DataPart(**dp_dict))
-        task_dict["data_parts"] = data_parts
+        task_dict["data_parts"] = [DataPart.model_construct(**dp_dict) for dp_dict in task_dict.get("data_parts", [])]
         
         # Convert status string to TaskStatus enum
         if isinstance(task_dict.get("status"), str):
-            task_dict["status"] = TaskStatus(task_dict["status"])
+            task_dict["status"] = _STATUS_BY_VALUE[task_dict["status"]]
+        
+        return Task.model_construct(**task_dict)
+    
+    def _split_payloads(self, task_dict: Dict[str, Any]) -> List[ReplaceOne]:
+        """
+        Move large data part payloads out of a stored task.
+        
+        Each moved payload is replaced by an empty dict and a payload_ref
+        naming its document in task_payloads. References are derived from
+        the task and data part IDs, so saving a task again overwrites them.
+        
+        Args:
+            task_dict: Dictionary from _task_to_dict, modified in place
+            
+        Returns:
+            Writes that store the moved payloads; run them before saving the task
+        """
+        operations = []
+        for data_part in task_dict["data_parts"]:
+            if len(bson.encode(data_part["data"])) > TASK_PAYLOAD_INLINE_LIMIT:
+                ref = f"{task_dict['_id']}:{data_part['id']}"
+                operations.append(ReplaceOne({"_id": ref}, {"data": data_part["data"]}, upsert=True))
+                data_part["data"] = {}
+                data_part["payload_ref"] = ref
+        return operations
+    
+    @staticmethod
+    def _payload_filter(task_id: str) -> Dict[str, Any]:
+        """Match every payload stored for a task; an anchored prefix regex is served by the _id index."""
+        return {"_id": {"$regex": f"^{re.escape(task_id)}:"}}
+    
+    @staticmethod
+    def _payload_refs(task_dicts: List[Dict[str, Any]]) -> List[str]:
+        """Get the payload references in stored tasks."""
+        return [
+            data_part["payload_ref"]
+            for task_dict in task_dicts
+            for data_part in task_dict.get("data_parts", [])
+            if "payload_ref" in data_part
+        ]
+    
+    @staticmethod
+    def _attach_payloads(task_dicts: List[Dict[str, Any]], payloads: Dict[str, Dict[str, Any]]) -> None:
+        """Put loaded payloads back into the data parts that reference them."""
+        for task_dict in task_dicts:
+            for data_part in task_dict.get("data_parts", []):
+                ref = data_part.pop("payload_ref", None)
+                if ref is not None:
+                    data_part["data"] = payloads.get(ref, {})
+    
+    def _load_payloads(self, task_dicts: List[Dict[str, Any]]) -> None:
+        """
+        Resolve the payload references in stored tasks with one query.
         
-        return Task(**task_dict)
+        Args:
+            task_dicts: Dictionaries from the tasks collection, modified in place
+        """
+        refs = self._payload_refs(task_dicts)
+        if refs:
+            cursor = self.payload_collection.find({"_id": {"$in": refs}})
+            self._attach_payloads(task_dicts, {doc["_id"]: doc["data"] for doc in cursor})
+    
+    async def _load_payloads_async(self, task_dicts: List[Dict[str, Any]]) -> None:
+        """
+        Resolve the payload references in stored tasks with one query asynchronously.
+        
+        Args:
+            task_dicts: Dictionaries from the tasks collection, modified in place
+        """
+        refs = self._payload_refs(task_dicts)
+        if refs:
+            cursor = self.async_payload_collection.find({"_id": {"$in": refs}})
+            self._attach_payloads(task_dicts, {doc["_id"]: doc["data"] async for doc in cursor})
+    
+    @staticmethod
+    def _task_fingerprint(task: Task) -> Tuple[int, Optional[bytes]]:
+        """
+        Summarize what a task may change besides its status and update time.
+        
+        Data parts are only ever appended, so their count stands in for
+        their contents; the metadata is small and compared in full.
+        
+        Args:
+            task: Task to summarize
+            
+        Returns:
+            Value that differs whenever the task's data parts or metadata do
+        """
+        return len(task.data_parts), json_dumps(task.metadata) if task.metadata else None
     
     def save_task(self, task: Task) -> bool:
         """
@@ -117,8 +469,13 @@ class TaskStorage(MongoStorage):
             True if successful, False otherwise
         """
         try:
+            saved_state = (task.status, self._task_fingerprint(task))
             task_dict = self._task_to_dict(task)
+            payload_operations = self._split_payloads(task_dict)
+            if payload_operations:
+                self.payload_collection.bulk_write(payload_operations, ordered=False)
             result = self.collection.replace_one({"_id": task.id}, task_dict, upsert=True)
+            self._saved_state[task.id] = saved_state
             return True
         except Exception as e:
             self.logger.error(f"Error saving task {task.id}: {e}")
@@ -128,6 +485,12 @@ class TaskStorage(MongoStorage):
         """
         Save a task to the database asynchronously.
         
+        Saves made while a write is in flight are queued and written
+        together in one unordered bulk write once it completes, so a burst
+        of saves costs a few round trips instead of one per task. A save is
+        queued before anything is awaited, so saves of the same task are
+        written in call order.
+        
         Args:
             task: Task to save
             
@@ -135,12 +498,160 @@ class TaskStorage(MongoStorage):
             True if successful, False otherwise
         """
         try:
+            saved_state = (task.status, self._task_fingerprint(task))
             task_dict = self._task_to_dict(task)
-            result = await self.async_collection.replace_one({"_id": task.id}, task_dict, upsert=True)
-            return True
+            payload_operations = self._split_payloads(task_dict)
+            operation = ReplaceOne({"_id": task.id}, task_dict, upsert=True)
         except Exception as e:
             self.logger.error(f"Error saving task {task.id} asynchronously: {e}")
             return False
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending_saves.append((task.id, payload_operations, operation, saved_state, future))
+        if self._save_writer is None:
+            self._save_writer = asyncio.create_task(self._write_pending_saves())
+        return await future
+    
+    async def save_task_changes_async(self, task: Task) -> bool:
+        """
+        Save a task asynchronously, writing only what changed since this storage last saved it.
+        
+        When only the status moved on, it is written with a $set update
+        instead of replacing the whole document; when nothing changed,
+        nothing is written. Otherwise the task is saved in full.
+        
+        Args:
+            task: Task to save
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        saved_state = self._saved_state.get(task.id)
+        if saved_state is not None and saved_state[1] == self._task_fingerprint(task):
+            if saved_state[0] == task.status:
+                return True
+            if await self.update_task_status_async(task.id, task.status, task.updated_at.isoformat()):
+                self._saved_state[task.id] = (task.status, saved_state[1])
+                return True
+        return await self.save_task_async(task)
+    
+    async def _write_pending_saves(self) -> None:
+        """Write queued saves in bulk until none are left, resolving each caller's future."""
+        batch = []
+        try:
+            while self._pending_saves:
+                batch = self._pending_saves[:TASK_SAVE_BATCH_SIZE]
+                del self._pending_saves[:TASK_SAVE_BATCH_SIZE]
+                await self._write_save_batch(batch)
+                batch = []
+        except asyncio.CancelledError:
+            # Nothing is left to write the queued saves, so fail them with the batch
+            batch, self._pending_saves = batch + self._pending_saves, []
+            raise
+        finally:
+            self._save_writer = None
+            for *_, future in batch:
+                if not future.done():
+                    future.set_result(False)
+    
+    async def _write_save_batch(self, batch: List[Tuple]) -> None:
+        """
+        Write a batch of queued saves and resolve their futures.
+        
+        Only the last save of each task in the batch is written: an
+        unordered bulk write doesn't keep the order of writes to the same
+        document. Earlier saves of that task resolve with its result.
+        
+        Args:
+            batch: Entries taken from _pending_saves, in call order
+        """
+        # Large payloads are written first, so a stored task never references a missing one
+        payload_operations = []
+        payload_owners = []
+        for index, (_, operations, _, _, _) in enumerate(batch):
+            payload_operations.extend(operations)
+            payload_owners.extend([index] * len(operations))
+        failed_saves = set()
+        if payload_operations:
+            failed = await self._bulk_replace_async(
+                self.async_payload_collection, payload_operations, "task payloads"
+            )
+            failed_saves = {payload_owners[index] for index in failed}
+        
+        # Index in the batch of the last save of each task whose payloads were written
+        latest = {}
+        for index, (task_id, *_) in enumerate(batch):
+            if index not in failed_saves:
+                latest[task_id] = index
+        written = list(latest.values())
+        failed = await self._bulk_replace_async(
+            self.async_collection, [batch[index][2] for index in written], "tasks"
+        ) if written else set()
+        saved = {batch[index][0] for position, index in enumerate(written) if position not in failed}
+        
+        for index in written:
+            task_id, _, _, saved_state, _ = batch[index]
+            if task_id in saved:
+                self._saved_state[task_id] = saved_state
+        for index, (task_id, _, _, _, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(index not in failed_saves and task_id in saved)
+    
+    async def _bulk_replace_async(self, collection, operations: List[ReplaceOne], label: str) -> Set[int]:
+        """
+        Run replace operations as one unordered bulk write.
+        
+        Args:
+            collection: Async collection to write to
+            operations: Operations to run
+            label: What the operations save, for log messages
+            
+        Returns:
+            Indexes of the operations that failed
+        """
+        try:
+            await collection.bulk_write(operations, ordered=False)
+            return set()
+        except BulkWriteError as e:
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            self.logger.error(f"Error saving {len(failed)} of {len(operations)} {label} asynchronously: {e}")
+            return failed
+        except Exception as e:
+            self.logger.error(f"Error saving {len(operations)} {label} asynchronously: {e}")
+            return set(range(len(operations)))
+    
+    async def bulk_save_tasks_async(self, tasks: List[Task]) -> bool:
+        """
+        Save several tasks to the database in one batch asynchronously.
+        
+        The batch is unordered, so one failing task doesn't stop the others.
+        
+        Args:
+            tasks: Tasks to save
+            
+        Returns:
+            True if every task was saved, False otherwise
+        """
+        if not tasks:
+            return True
+        try:
+            operations = []
+            payload_operations = []
+            saved_states = []
+            for task in tasks:
+                saved_states.append((task.id, (task.status, self._task_fingerprint(task))))
+                task_dict = self._task_to_dict(task)
+                payload_operations.extend(self._split_payloads(task_dict))
+                operations.append(ReplaceOne({"_id": task.id}, task_dict, upsert=True))
+            if payload_operations:
+                await self.async_payload_collection.bulk_write(payload_operations, ordered=False)
+            await self.async_collection.bulk_write(operations, ordered=False)
+            # Later saves of these tasks can then write only their status
+            self._saved_state.update(saved_states)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving {len(tasks)} tasks asynchronously: {e}")
+            return False
     
     def get_task(self, task_id: str) -> Optional[Task]:
         """
@@ -156,6 +667,7 @@ class TaskStorage(MongoStorage):
             task_dict = self.collection.find_one({"_id": task_id})
             if not task_dict:
                 return None
+            self._load_payloads([task_dict])
             return self._dict_to_task(task_dict)
         except Exception as e:
             self.logger.error(f"Error getting task {task_id}: {e}")
@@ -175,58 +687,66 @@ class TaskStorage(MongoStorage):
             task_dict = await self.async_collection.find_one({"_id": task_id})
             if not task_dict:
                 return None
+            await self._load_payloads_async([task_dict])
             return self._dict_to_task(task_dict)
         except Exception as e:
             self.logger.error(f"Error getting task {task_id} asynchronously: {e}")
             return None
     
-    def get_tasks_by_status(self, status: TaskStatus) -> List[Task]:
+    def get_tasks_by_status(self, status: TaskStatus, include_data_parts: bool = True) -> List[Task]:
         """
-        Get all tasks with a specific status.
+        Get all tasks with a specific status, most recently updated first.
         
         Args:
             status: Status to filter by
+            include_data_parts: Whether to load data parts; skip them when only IDs and status are needed
             
         Returns:
             List of tasks with the specified status
         """
         try:
-            tasks = []
-            cursor = self.collection.find({"status": status.value})
-            for task_dict in cursor:
-                tasks.append(self._dict_to_task(task_dict))
-            return tasks
+            projection = None if include_data_parts else TASK_SUMMARY_PROJECTION
+            cursor = self.collection.find({"status": status.value}, projection).sort("updated_at", DESCENDING)
+            task_dicts = list(cursor)
+            if include_data_parts:
+                self._load_payloads(task_dicts)
+            return [self._dict_to_task(task_dict) for task_dict in task_dicts]
         except Exception as e:
             self.logger.error(f"Error getting tasks by status {status}: {e}")
             return []
     
-    async def get_tasks_by_status_async(self, status: TaskStatus) -> List[Task]:
+    async def get_tasks_by_status_async(
+        self, status: TaskStatus, include_data_parts: bool = True
+    ) -> List[Task]:
         """
-        Get all tasks with a specific status asynchronously.
+        Get all tasks with a specific status asynchronously, most recently updated first.
         
         Args:
             status: Status to filter by
+            include_data_parts: Whether to load data parts; skip them when only IDs and status are needed
             
         Returns:
             List of tasks with the specified status
         """
         try:
-            tasks = []
-            cursor = self.async_collection.find({"status": status.value})
-            async for task_dict in cursor:
-                tasks.append(self._dict_to_task(task_dict))
-            return tasks
+            projection = None if include_data_parts else TASK_SUMMARY_PROJECTION
+            cursor = self.async_collection.find({"status": status.value}, projection).sort("updated_at", DESCENDING)
+            task_dicts = await cursor.to_list(length=None)
+            if include_data_parts:
+                await self._load_payloads_async(task_dicts)
+            return [self._dict_to_task(task_dict) for task_dict in task_dicts]
         except Exception as e:
             self.logger.error(f"Error getting tasks by status {status} asynchronously: {e}")
             return []
     
-    def update_task_status(self, task_id: str, status: TaskStatus) -> bool:
+    def update_task_status(self, task_id: str, status: TaskStatus, now_iso: Optional[str] = None) -> bool:
         """
         Update the status of a task.
         
         Args:
             task_id: ID of the task to update
             status: New status
+            now_iso: Update time in ISO 8601 format, for callers that already have it; defaults to now
             
         Returns:
             True if successful, False otherwise
@@ -234,20 +754,23 @@ class TaskStorage(MongoStorage):
         try:
             result = self.collection.update_one(
                 {"_id": task_id},
-                {"$set": {"status": status.value, "updated_at": datetime.now().isoformat()}}
+                {"$set": {"status": status.value, "updated_at": now_iso or datetime.now().isoformat()}}
             )
             return result.modified_count > 0
         except Exception as e:
             self.logger.error(f"Error updating task {task_id} status to {status}: {e}")
             return False
     
-    async def update_task_status_async(self, task_id: str, status: TaskStatus) -> bool:
+    async def update_task_status_async(
+        self, task_id: str, status: TaskStatus, now_iso: Optional[str] = None
+    ) -> bool:
         """
         Update the status of a task asynchronously.
         
         Args:
             task_id: ID of the task to update
             status: New status
+            now_iso: Update time in ISO 8601 format, for callers that already have it; defaults to now
             
         Returns:
             True if successful, False otherwise
@@ -255,9 +778,47 @@ class TaskStorage(MongoStorage):
         try:
             result = await self.async_collection.update_one(
                 {"_id": task_id},
-                {"$set": {"status": status.value, "updated_at": datetime.now().isoformat()}}
+                {"$set": {"status": status.value, "updated_at": now_iso or datetime.now().isoformat()}}
             )
             return result.modified_count > 0
         except Exception as e:
             self.logger.error(f"Error updating task {task_id} status to {status} asynchronously: {e}")
-            return False 
\ No newline at end of file
+            return False 
+    
+    def delete_task(self, task_id: str) -> bool:
+        """
+        Delete a task and its stored payloads from the database.
+        
+        Args:
+            task_id: ID of the task to delete
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        self._saved_state.pop(task_id, None)
+        try:
+            result = self.collection.delete_one({"_id": task_id})
+            self.payload_collection.delete_many(self._payload_filter(task_id))
+            return result.deleted_count > 0
+        except Exception as e:
+            self.logger.error(f"Error deleting task {task_id}: {e}")
+            return False
+    
+    async def delete_task_async(self, task_id: str) -> bool:
+        """
+        Delete a task and its stored payloads from the database asynchronously.
+        
+        Args:
+            task_id: ID of the task to delete
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        self._saved_state.pop(task_id, None)
+        try:
+            result = await self.async_collection.delete_one({"_id": task_id})
+            await self.async_payload_collection.delete_many(self._payload_filter(task_id))
+            return result.deleted_count > 0
+        except Exception as e:
+            self.logger.error(f"Error deleting task {task_id} asynchronously: {e}")
+            return False
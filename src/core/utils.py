@@ -5,28 +5,149 @@ This module provides common utility functions used across the SocialSpark agents
 """
 
 import os
+import sys
 import json
+import mmap
+import time
 import uuid
 import logging
-import base64
-from typing import Any, Dict, List, Optional, Union
-from datetime import datetime
+import threading
+from typing import Any, Dict, List, Optional, Set, Union
+from datetime import datetime, timezone
 
 from src.core.models import DataPart
 
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib codec
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # C parser for ISO 8601, much faster than the stdlib on the ingest path
+    import ciso8601
+except ImportError:
+    ciso8601 = None
+
+try:
+    # MessagePack codec for internal state files, which nobody needs to read by hand
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+# Layout used by format_datetime and parse_datetime unless told otherwise
+_DEFAULT_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Bytes of an image read and encoded at a time; a multiple of 3, so every
+# chunk but the last encodes to whole base64 blocks with no padding
+IMAGE_ENCODE_CHUNK_SIZE = 48 * 1024
+
+# JSON files at least this large are parsed by orjson straight from a memory
+# map, instead of first being read into a bytes copy
+JSON_MMAP_THRESHOLD = 1024 * 1024
+
+# Random bytes drawn for generate_id in one os.urandom call, enough for 256 IDs
+_ID_POOL_SIZE = 16 * 256
+
+# Largest slice of a decoded image passed to a single os.write call
+IMAGE_WRITE_CHUNK_SIZE = 1024 * 1024
+
+# Start of the current UTC day as an epoch timestamp, and its ISO 8601 date prefix
+_ISO_DAY = (0.0, "")
+
+# Directories save_to_json_file has already made sure exist
+_KNOWN_DIRS: Set[str] = set()
+
+# Unused part of the random pool for generate_id, and the lock guarding it
+_id_pool = memoryview(b"")
+_id_pool_lock = threading.Lock()
+
+
+def _reset_id_pool() -> None:
+    """Drop the random pool, so a forked child never reuses its parent's bytes."""
+    global _id_pool, _id_pool_lock
+    _id_pool = memoryview(b"")
+    _id_pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_id_pool)
+
+
+def _json_default(obj: Any) -> str:
+    """Serialize values the stdlib json module doesn't handle natively."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def json_dumps(data: Any) -> bytes:
+    """
+    Serialize data to JSON bytes, using orjson when it is installed.
+    
+    Datetimes are written in ISO 8601 format and other unknown types as strings.
+    
+    Args:
+        data: Data to serialize
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_json_default).encode("utf-8")
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse JSON, using orjson when it is installed.
+    
+    Args:
+        data: JSON document
+        
+    Returns:
+        Parsed data
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 def generate_id() -> str:
     """
     Generate a unique ID.
     
+    The ID is a random (version 4) UUID. Its random bits come from a pool
+    refilled every 256 IDs, instead of one os.urandom call per ID.
+    
     Returns:
         A UUID as a string
     """
-    return str(uuid.uuid4())
+    global _id_pool
+    with _id_pool_lock:
+        if not _id_pool:
+            _id_pool = memoryview(os.urandom(_ID_POOL_SIZE))
+        raw = bytearray(_id_pool[:16])
+        _id_pool = _id_pool[16:]
+    
+    # Version and variant bits, as uuid.uuid4() sets them
+    raw[6] = (raw[6] & 0x0F) | 0x40
+    raw[8] = (raw[8] & 0x3F) | 0x80
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
 
 
 def create_data_part(
-    data: Dict[str, Any], content_type: str = "application/json", metadata: Optional[Dict[str, Any]] = None
+    data: Dict[str, Any],
+    content_type: str = "application/json",
+    metadata: Optional[Dict[str, Any]] = None,
+    id: Optional[str] = None
 ) -> DataPart:
     """
     Create a new data part.
@@ -35,18 +156,68 @@ def create_data_part(
         data: The data payload
         content_type: MIME type of the data, defaults to application/json
         metadata: Optional metadata
+        id: Optional ID for the data part; a new one is generated if not given
         
     Returns:
         A new DataPart instance
     """
     return DataPart(
-        id=generate_id(),
+        id=id if id is not None else generate_id(),
         content_type=content_type,
         data=data,
         metadata=metadata
     )
 
 
+def _encode_file(image_path: str) -> bytearray:
+    """
+    Base64-encode a file chunk by chunk into a buffer sized for the result.
+    
+    The whole raw file is never held in memory next to its encoding.
+    
+    Args:
+        image_path: Path to the file
+        
+    Returns:
+        Base64-encoded file contents
+    """
+    # Unbuffered: reads land directly in the chunk, without passing through a read buffer
+    with open(image_path, "rb", buffering=0) as image_file:
+        fd = image_file.fileno()
+        size = os.fstat(fd).st_size
+        if hasattr(os, "posix_fadvise"):
+            try:
+                # Let the kernel read ahead aggressively for the single front-to-back pass
+                os.posix_fadvise(fd, 0, size, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        
+        encoded = bytearray((size + 2) // 3 * 4)
+        view = memoryview(bytearray(IMAGE_ENCODE_CHUNK_SIZE))
+        pos = 0
+        while True:
+            # Fill the whole chunk unless the file ends, keeping chunks aligned to 3 bytes
+            n = 0
+            while n < IMAGE_ENCODE_CHUNK_SIZE:
+                read = image_file.readinto(view[n:])
+                if not read:
+                    break
+                n += read
+            if not n:
+                break
+            
+            block = base64.b64encode(view[:n])
+            encoded[pos:pos + len(block)] = block
+            pos += len(block)
+            if n < IMAGE_ENCODE_CHUNK_SIZE:
+                break
+    
+    # The file may have changed size since it was measured
+    if pos != len(encoded):
+        del encoded[pos:]
+    return encoded
+
+
 def encode_image(image_path: str) -> str:
     """
     Encode an image to base64 for transmission.
@@ -58,53 +229,155 @@ def encode_image(image_path: str) -> str:
         Base64-encoded image data as a string
     """
     try:
-        with open(image_path, "rb") as image_file:
-            encoded = base64.b64encode(image_file.read()).decode('utf-8')
-            return encoded
-    except Exception as e:
+        return _encode_file(image_path).decode("ascii")
+    except OSError as e:
         logging.error(f"Error encoding image: {e}")
         return ""
 
 
-def decode_image(base64_data: str, output_path: str) -> bool:
+def encode_image_bytes(image_path: str) -> bytearray:
+    """
+    Encode an image to base64, without converting the result to a string.
+    
+    For callers passing the encoding on as bytes (e.g. a request body),
+    this skips a str copy the size of the encoded image.
+    
+    Args:
+        image_path: Path to the image file
+        
+    Returns:
+        Base64-encoded image data as ASCII bytes; empty on failure
+    """
+    try:
+        return _encode_file(image_path)
+    except OSError as e:
+        logging.error(f"Error encoding image: {e}")
+        return bytearray()
+
+
+def _decode(base64_data: Union[str, bytes], validate: bool = False) -> Optional[bytes]:
+    """
+    Base64-decode data.
+    
+    Args:
+        base64_data: Base64-encoded data
+        validate: Reject any character outside the base64 alphabet; otherwise they are skipped
+        
+    Returns:
+        Decoded data, or None if strictly validated data has a length no valid encoding has
+        
+    Raises:
+        binascii.Error: If the data is not valid base64
+    """
+    # Strict base64 is always padded to a multiple of 4, so a wrong length fails without running the decoder
+    if validate and len(base64_data) & 3:
+        return None
+    return base64.b64decode(base64_data, validate=validate)
+
+
+def decode_image_bytes(base64_data: Union[str, bytes], validate: bool = False) -> Optional[bytes]:
+    """
+    Decode a base64-encoded image in memory, without saving it.
+    
+    Args:
+        base64_data: Base64-encoded image data
+        validate: Reject characters outside the base64 alphabet; set for untrusted input
+        
+    Returns:
+        Decoded image data if successful, None otherwise
+    """
+    try:
+        image_data = _decode(base64_data, validate)
+        if image_data is None:
+            logging.error("Error decoding image: invalid base64 length")
+        return image_data
+    except ValueError as e:
+        # binascii.Error, raised for malformed base64, is a ValueError
+        logging.error(f"Error decoding image: {e}")
+        return None
+
+
+def decode_image(base64_data: str, output_path: str, validate: bool = False) -> bool:
     """
     Decode a base64-encoded image and save it.
     
     Args:
         base64_data: Base64-encoded image data
         output_path: Path to save the decoded image
+        validate: Reject characters outside the base64 alphabet; set for untrusted input
         
     Returns:
         True if successful, False otherwise
     """
+    tmp_path = None
     try:
-        image_data = base64.b64decode(base64_data)
-        with open(output_path, "wb") as image_file:
-            image_file.write(image_data)
+        image_data = _decode(base64_data, validate)
+        if image_data is None:
+            logging.error("Error decoding image: invalid base64 length")
+            return False
+        # Write to a temporary file first so a half-written image is never visible at output_path
+        tmp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+        # Written through the raw file descriptor, with no user-space buffer in between
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            view = memoryview(image_data)
+            while view:
+                written = os.write(fd, view[:IMAGE_WRITE_CHUNK_SIZE])
+                view = view[written:]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, output_path)
         return True
-    except Exception as e:
+    except (ValueError, OSError) as e:
         logging.error(f"Error decoding image: {e}")
+        if tmp_path is not None:
+            # Don't leave the partial write behind; it may not have been created at all
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
         return False
 
 
-def extract_data_part_by_content_type(task_data_parts: List[DataPart], content_type: str) -> Optional[DataPart]:
+def index_data_parts(task_data_parts: List[DataPart]) -> Dict[str, DataPart]:
     """
-    Extract a data part from a task by content type.
+    Index data parts by content type, for looking up several types in the same task.
     
     Args:
         task_data_parts: List of data parts from a task
+        
+    Returns:
+        The first data part of each content type, keyed by content type
+    """
+    index: Dict[str, DataPart] = {}
+    for data_part in task_data_parts:
+        index.setdefault(data_part.content_type, data_part)
+    return index
+
+
+def extract_data_part_by_content_type(
+    task_data_parts: Union[List[DataPart], Dict[str, DataPart]], content_type: str
+) -> Optional[DataPart]:
+    """
+    Extract a data part from a task by content type.
+    
+    Args:
+        task_data_parts: List of data parts from a task, or an index of them from index_data_parts()
         content_type: Content type to look for
         
     Returns:
-        Matching DataPart if found, None otherwise
+        First matching DataPart if found, None otherwise
     """
+    if isinstance(task_data_parts, dict):
+        return task_data_parts.get(content_type)
+    
     for data_part in task_data_parts:
         if data_part.content_type == content_type:
             return data_part
     return None
 
 
-def format_datetime(dt: datetime, format_str: str = "%Y-%m-%d %H:%M:%S") -> str:
+def format_datetime(dt: datetime, format_str: str = _DEFAULT_DATETIME_FORMAT) -> str:
     """
     Format a datetime object to a string.
     
@@ -115,10 +388,17 @@ def format_datetime(dt: datetime, format_str: str = "%Y-%m-%d %H:%M:%S") -> str:
     Returns:
         Formatted datetime string
     """
+    # isoformat writes the fields directly, without strftime's format scanning; it
+    # matches strftime only for naive datetimes with 4-digit years
+    if dt.tzinfo is None and dt.year >= 1000:
+        if format_str == _DEFAULT_DATETIME_FORMAT:
+            return dt.isoformat(sep=" ", timespec="seconds")
+        if format_str == "%Y-%m-%dT%H:%M:%S":
+            return dt.isoformat(timespec="seconds")
     return dt.strftime(format_str)
 
 
-def parse_datetime(dt_str: str, format_str: str = "%Y-%m-%d %H:%M:%S") -> Optional[datetime]:
+def parse_datetime(dt_str: str, format_str: str = _DEFAULT_DATETIME_FORMAT) -> Optional[datetime]:
     """
     Parse a datetime string to a datetime object.
     
@@ -130,35 +410,159 @@ def parse_datetime(dt_str: str, format_str: str = "%Y-%m-%d %H:%M:%S") -> Option
         Datetime object if successful, None otherwise
     """
     try:
+        # The default layout is a subset of ISO 8601, which the C parser reads
+        # far faster than strptime; only exactly that shape takes the fast path
+        if (
+            format_str == _DEFAULT_DATETIME_FORMAT
+            and len(dt_str) == 19
+            and dt_str[4] == dt_str[7] == "-"
+            and dt_str[10] == " "
+            and dt_str[13] == dt_str[16] == ":"
+        ):
+            return datetime.fromisoformat(dt_str)
         return datetime.strptime(dt_str, format_str)
     except ValueError as e:
         logging.error(f"Error parsing datetime: {e}")
         return None
 
 
-def save_to_json_file(data: Any, file_path: str) -> bool:
+def parse_iso_datetime(dt_str: str) -> datetime:
+    """
+    Parse an ISO 8601 datetime string, including a trailing Z for UTC.
+    
+    Args:
+        dt_str: Datetime string to parse
+        
+    Returns:
+        Datetime object
+        
+    Raises:
+        ValueError: If the string is not a valid ISO 8601 datetime
+    """
+    if ciso8601 is not None:
+        return ciso8601.parse_datetime(dt_str)
+    if sys.version_info < (3, 11) and dt_str.endswith("Z"):
+        # fromisoformat only accepts Z from Python 3.11 on
+        dt_str = dt_str[:-1] + "+00:00"
+    return datetime.fromisoformat(dt_str)
+
+
+def utc_now_iso() -> str:
+    """
+    Format the current UTC time as ISO 8601 with millisecond precision, e.g. 2024-01-15T12:34:56.789Z.
+    
+    The date part is formatted once per day and reused, so each call only
+    formats the time of day.
+    
+    Returns:
+        Current UTC time string
+    """
+    global _ISO_DAY
+    now = time.time()
+    day_start, day_prefix = _ISO_DAY
+    if now - day_start >= 86400 or now < day_start:
+        day_start = now - now % 86400
+        day_prefix = datetime.fromtimestamp(day_start, timezone.utc).strftime("%Y-%m-%dT")
+        _ISO_DAY = (day_start, day_prefix)
+    
+    ms = int((now - day_start) * 1000)
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{day_prefix}{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}Z"
+
+
+def _ensure_parent_dir(file_path: str) -> str:
+    """
+    Create a file's directory if needed, checking each directory once per process.
+    
+    Args:
+        file_path: Path to the file about to be written
+        
+    Returns:
+        The file's directory, for forgetting it with _KNOWN_DIRS.discard() if the write fails
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    if directory not in _KNOWN_DIRS:
+        os.makedirs(directory, exist_ok=True)
+        _KNOWN_DIRS.add(directory)
+    return directory
+
+
+def save_to_json_file(data: Any, file_path: str, indent: Optional[int] = None) -> bool:
     """
     Save data to a JSON file.
     
     Args:
         data: Data to save
         file_path: Path to the output file
+        indent: Spaces to indent nested values by, for human-readable files; compact if None
         
     Returns:
         True if successful, False otherwise
     """
+    directory = None
     try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        directory = _ensure_parent_dir(file_path)
+        
+        # Both paths write datetimes as ISO 8601, so files don't change shape when orjson is missing
+        # orjson only indents by 2; other widths go through the stdlib encoder
+        if orjson is not None and indent in (None, 2):
+            option = orjson.OPT_NON_STR_KEYS
+            if indent is not None:
+                option |= orjson.OPT_INDENT_2
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(data, default=_json_default, option=option))
+            return True
         
         with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+            if indent is None:
+                # Without an indent, the stdlib encoder can use its C implementation
+                f.write(json.dumps(data, default=_json_default, separators=(",", ":")))
+            else:
+                json.dump(data, f, indent=indent, default=_json_default)
         return True
-    except Exception as e:
+    except (OSError, TypeError, ValueError) as e:
+        # Unserializable data raises TypeError (orjson.JSONEncodeError) or ValueError (circular references).
+        # The directory may have been removed since it was created; check it again next time
+        _KNOWN_DIRS.discard(directory)
         logging.error(f"Error saving to JSON file: {e}")
         return False
 
 
+def save_many_to_jsonl(items: List[Any], file_path: str) -> bool:
+    """
+    Save several items to a JSON Lines file, one compact JSON document per line.
+    
+    All lines are encoded into one buffer and written with a single write,
+    instead of opening a file per item.
+    
+    Args:
+        items: Items to save, e.g. data parts dumped with model_dump()
+        file_path: Path to the output file
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    directory = None
+    try:
+        directory = _ensure_parent_dir(file_path)
+        
+        buffer = bytearray()
+        append = buffer.extend
+        for item in items:
+            append(json_dumps(item))
+            append(b"\n")
+        
+        with open(file_path, 'wb') as f:
+            f.write(buffer)
+        return True
+    except (OSError, TypeError, ValueError) as e:
+        _KNOWN_DIRS.discard(directory)
+        logging.error(f"Error saving to JSON Lines file: {e}")
+        return False
+
+
 def load_from_json_file(file_path: str) -> Optional[Any]:
     """
     Load data from a JSON file.
@@ -173,8 +577,91 @@ def load_from_json_file(file_path: str) -> Optional[Any]:
         if not os.path.exists(file_path):
             return None
             
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except Exception as e:
+        with open(file_path, 'rb') as f:
+            if orjson is not None and os.fstat(f.fileno()).st_size >= JSON_MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    # The view must be released before the map can close
+                    with memoryview(mapped) as view:
+                        return orjson.loads(view)
+            return json_loads(f.read())
+    except (OSError, ValueError) as e:
+        # Both json and orjson raise a ValueError subclass for malformed JSON
         logging.error(f"Error loading from JSON file: {e}")
+        return None
+
+
+def save_to_msgpack_file(data: Any, file_path: str) -> bool:
+    """
+    Save data to a MessagePack file, for internal state such as checkpoints and caches.
+    
+    MessagePack is smaller and faster to encode and decode than JSON, and
+    encodes datetimes natively. Keep JSON for files people or other tools read.
+    Needs msgspec, which is listed in requirements.txt.
+    
+    Args:
+        data: Data to save
+        file_path: Path to the output file
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    if msgspec is None:
+        logging.error("Error saving to MessagePack file: msgspec is not installed (pip install msgspec)")
+        return False
+    
+    directory = None
+    try:
+        directory = _ensure_parent_dir(file_path)
+        with open(file_path, 'wb') as f:
+            f.write(msgspec.msgpack.encode(data, enc_hook=_json_default))
+        return True
+    except (OSError, msgspec.MsgspecError) as e:
+        _KNOWN_DIRS.discard(directory)
+        logging.error(f"Error saving to MessagePack file: {e}")
+        return False
+
+
+def load_from_msgpack_file(file_path: str) -> Optional[Any]:
+    """
+    Load data from a MessagePack file written by save_to_msgpack_file().
+    
+    Args:
+        file_path: Path to the input file
+        
+    Returns:
+        Loaded data if successful, None otherwise
+    """
+    if msgspec is None:
+        logging.error("Error loading from MessagePack file: msgspec is not installed (pip install msgspec)")
+        return None
+    
+    try:
+        if not os.path.exists(file_path):
+            return None
+        
+        with open(file_path, 'rb') as f:
+            return msgspec.msgpack.decode(f.read())
+    except (OSError, msgspec.MsgspecError) as e:
+        logging.error(f"Error loading from MessagePack file: {e}")
+        return None
+
+
+def load_jsonl(file_path: str) -> Optional[List[Any]]:
+    """
+    Load the items from a JSON Lines file.
+    
+    Args:
+        file_path: Path to the input file
+        
+    Returns:
+        Items in file order, skipping blank lines, if successful; None otherwise
+    """
+    try:
+        if not os.path.exists(file_path):
+            return None
+        
+        with open(file_path, 'rb') as f:
+            return [json_loads(line) for line in f if line.strip()]
+    except (OSError, ValueError) as e:
+        logging.error(f"Error loading from JSON Lines file: {e}")
         return None 
\ No newline at end of file